@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import async_engine, engine, get_db, replica_async_engine, replica_engine
+from app.core.pool import pool_status
+from app.core.query_log import query_stats
+from app.api.deps import require_permission
+from app.models.user import User
+from app.services.blobs import storage_stats
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/db/pool")
+async def get_db_pool_status(
+    current_user: User = Depends(require_permission("system:read"))
+) -> dict:
+    """
+    获取数据库连接池状态
+    
+    Args:
+        current_user: 当前活跃用户
+    
+    Returns:
+        主库和只读副本的同步、异步连接池的连接数、取连接次数和等待时间分布
+    """
+    pools = {
+        "primary": {
+            "sync": pool_status(engine),
+            "async": pool_status(async_engine.sync_engine),
+        }
+    }
+    if replica_engine is not None:
+        pools["replica"] = {
+            "sync": pool_status(replica_engine),
+            "async": pool_status(replica_async_engine.sync_engine),
+        }
+    return pools
+
+
+@router.get("/db/queries")
+async def get_db_query_stats(
+    sort: str = Query("total", pattern="^(count|total|p95|max)$", description="排序字段"),
+    limit: int = Query(50, ge=1, le=500, description="返回的语句数"),
+    current_user: User = Depends(require_permission("system:read"))
+) -> list:
+    """
+    获取按归一化语句汇总的SQL执行统计
+    
+    Args:
+        sort: 排序字段，count、total、p95 或 max
+        limit: 返回的语句数
+        current_user: 当前活跃用户
+    
+    Returns:
+        语句的执行次数、总耗时、平均耗时、P95和最大耗时
+    """
+    return query_stats.snapshot(sort, limit)
+
+
+@router.get("/storage")
+async def get_storage_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("system:read"))
+) -> dict:
+    """
+    获取档案文件存储的去重统计
+    
+    Args:
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        文件数、引用数、实际占用、逻辑大小、去重比和最近一次垃圾回收的结果
+    """
+    return await storage_stats(db)
@@ -1,30 +1,188 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, File, Header, HTTPException, status, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.archive import Archive, ArchiveCategory
+from app.core.pagination import (
+    apply_sort,
+    cached_count,
+    invalidate_counts,
+    paginate_by_cursor,
+    paginate_by_offset
+)
+from app.models.archive import Archive, ArchiveCategory, ArchiveUpload
 from app.schemas.archive import (
     Archive as ArchiveSchema,
     ArchiveCreate,
     ArchiveUpdate,
     ArchiveCategory as ArchiveCategorySchema,
     ArchiveCategoryCreate,
-    ArchiveCategoryUpdate
+    ArchiveCategoryUpdate,
+    ArchiveCategoryTree as ArchiveCategoryTreeSchema,
+    ArchiveImportResult,
+    ArchiveBulkSelector,
+    ArchiveBulkUpdate,
+    ArchiveBulkDelete,
+    ArchiveBulkResult,
+    ArchiveUploadCreate,
+    ArchiveUpload as ArchiveUploadSchema
 )
-from app.api.deps import get_current_active_user
+from app.schemas.common import Page
+from app.api.deps import get_current_active_user, get_read_db, require_permission
 from app.models.user import User
+from app.services import blobs
+from app.services import category as category_service
+from app.services import storage
+from app.services.archive_import import IMPORT_FORMATS, ArchiveImporter, detect_format
+from app.services.export import export_response
 
 router = APIRouter(prefix="/api/archive", tags=["archive"])
 
+# 档案列表允许的排序字段
+ARCHIVE_SORT_COLUMNS = {
+    "id": Archive.id,
+    "created_at": Archive.created_at,
+    "updated_at": Archive.updated_at,
+    "title": Archive.title,
+}
+
+
+def _filter_archives(query, name: Optional[str], category_id: Optional[int], include_descendants: bool):
+    """
+    为档案查询附加列表和导出共用的筛选条件
+
+    Args:
+        query: 档案查询
+        name: 档案名称
+        category_id: 档案分类ID
+        include_descendants: 是否包含子孙分类下的档案
+
+    Returns:
+        附加筛选条件后的查询
+    """
+    # 如果指定了分类，筛选该分类（或整棵子树）下的档案
+    if category_id:
+        if include_descendants:
+            query = query.where(Archive.category_id.in_(category_service.subtree_ids(ArchiveCategory, category_id)))
+        else:
+            query = query.where(Archive.category_id == category_id)
+    
+    # 如果指定了名称，筛选包含该名称的档案
+    if name:
+        query = query.where(Archive.title.contains(name))
+    return query
+
+
+def _select_bulk(statement, selector: ArchiveBulkSelector):
+    """
+    为批量更新、删除或计数语句附加选择条件
+
+    Args:
+        statement: UPDATE、DELETE 或 SELECT 语句
+        selector: 批量操作的选择条件
+
+    Returns:
+        附加条件后的语句
+
+    Raises:
+        HTTPException: 如果未指定任何条件或ID列表过长
+    """
+    if selector.ids is None and not selector.name and not selector.category_id:
+        # 不允许无条件地修改全部档案
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids or a filter is required"
+        )
+    if selector.ids is not None:
+        if len(selector.ids) > settings.BULK_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.BULK_MAX_IDS} ids are allowed"
+            )
+        statement = statement.where(Archive.id.in_(selector.ids))
+    return _filter_archives(statement, selector.name, selector.category_id, selector.include_descendants)
+
+
+async def _count_bulk(db: AsyncSession, selector: ArchiveBulkSelector) -> int:
+    """统计批量操作选中的档案数，用于 dry_run"""
+    result = await db.execute(_select_bulk(select(func.count()).select_from(Archive), selector))
+    return result.scalar_one()
+
+
+async def _release_bulk_files(db: AsyncSession, selector: ArchiveBulkSelector, *conditions) -> None:
+    """按内容哈希汇总批量操作选中档案（及满足附加条件）的文件，一次性减少引用计数"""
+    result = await db.execute(
+        _select_bulk(select(Archive.file_hash, func.count()), selector)
+        .where(Archive.file_hash.is_not(None), *conditions)
+        .group_by(Archive.file_hash)
+    )
+    await blobs.release_blobs(db, dict(result.all()))
+
+
+def _check_file_path(file_path: Optional[str]) -> None:
+    """
+    校验客户端提交的 file_path
+
+    内容寻址存储中的文件按引用计数回收，档案只能通过上传接口关联其中的文件并登记引用；
+    直接填写其路径的档案不持有引用，文件可能在原档案删除后被回收。
+
+    Args:
+        file_path: 客户端提交的文件路径
+
+    Raises:
+        HTTPException: 如果路径位于内容寻址存储中
+    """
+    if blobs.is_blob_path(file_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="file_path must not point into the blob store, upload the file instead"
+        )
+
+
+async def _unreferenced_files(db: AsyncSession, file_paths) -> List[str]:
+    """
+    从档案不再使用的旧文件中筛选出可以删除的文件，须在修改或删除档案之后、提交之前调用
+
+    调用方只传入本服务写入的文件（引入内容寻址存储前上传、file_size 不为空的文件；
+    客户端修改 file_path 时 file_size 随之清空）。客户端可将其他档案的 file_path 设为相同路径，
+    仍被任一档案引用的文件保留。内容寻址存储中的文件只由垃圾回收删除。
+
+    Args:
+        db: 数据库会话
+        file_paths: 相对于存储目录的路径
+
+    Returns:
+        提交后可以删除的文件路径
+    """
+    candidates = {file_path for file_path in file_paths if file_path and not blobs.is_blob_path(file_path)}
+    if not candidates:
+        return []
+    await db.flush()
+    result = await db.execute(select(Archive.file_path).where(Archive.file_path.in_(candidates)).distinct())
+    return sorted(candidates - set(result.scalars().all()))
+
+
+# 档案分类树缓存
+category_tree = category_service.CategoryTreeCache(ArchiveCategory, ArchiveCategoryTreeSchema)
+
 
 # 档案分类管理
 
 @router.post("/category", response_model=ArchiveCategorySchema)
-def create_archive_category(
+async def create_archive_category(
     category_in: ArchiveCategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> ArchiveCategorySchema:
     """
     创建档案分类
@@ -38,8 +196,9 @@ def create_archive_category(
         创建的档案分类信息
     """
     # 检查父分类是否存在
+    parent = None
     if category_in.parent_id:
-        result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_in.parent_id))
+        result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_in.parent_id))
         parent = result.scalars().first()
         if not parent:
             raise HTTPException(
@@ -55,15 +214,17 @@ def create_archive_category(
     )
     
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await category_service.assign_path(db, db_category, parent)
+    await category_tree.invalidate(db)
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
 
 @router.get("/category", response_model=List[ArchiveCategorySchema])
-def get_archive_categories(
-    db: Session = Depends(get_db),
+async def get_archive_categories(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> List[ArchiveCategorySchema]:
     """
@@ -76,17 +237,35 @@ def get_archive_categories(
     Returns:
         档案分类列表
     """
-    result = db.execute(select(ArchiveCategory))
+    result = await db.execute(select(ArchiveCategory))
     categories = result.scalars().all()
     return categories
 
 
+@router.get("/category/tree", response_model=List[ArchiveCategoryTreeSchema])
+async def get_archive_category_tree(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """
+    获取档案分类树
+    
+    Args:
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        嵌套的档案分类树，直接返回缓存的JSON
+    """
+    return Response(content=await category_tree.get(db), media_type="application/json")
+
+
 @router.put("/category/{category_id}", response_model=ArchiveCategorySchema)
-def update_archive_category(
+async def update_archive_category(
     category_id: int,
     category_in: ArchiveCategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> ArchiveCategorySchema:
     """
     更新档案分类
@@ -101,9 +280,9 @@ def update_archive_category(
         更新后的档案分类信息
     
     Raises:
-        HTTPException: 如果档案分类不存在
+        HTTPException: 如果档案分类不存在或新的父分类是其自身或子孙分类
     """
-    result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_id))
+    result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_id))
     category = result.scalars().first()
     if not category:
         raise HTTPException(
@@ -112,8 +291,9 @@ def update_archive_category(
         )
     
     # 检查父分类是否存在
+    parent = None
     if category_in.parent_id:
-        result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_in.parent_id))
+        result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_in.parent_id))
         parent = result.scalars().first()
         if not parent:
             raise HTTPException(
@@ -124,21 +304,26 @@ def update_archive_category(
     # 更新档案分类信息
     update_data = category_in.dict(exclude_unset=True)
     
+    # 父分类变更时检查是否成环，并改写整棵子树的路径
+    if "parent_id" in update_data and update_data["parent_id"] != category.parent_id:
+        await category_service.move_subtree(db, ArchiveCategory, category, parent)
+    
     # 更新档案分类属性
     for key, value in update_data.items():
         setattr(category, key, value)
     
-    db.commit()
-    db.refresh(category)
+    await category_tree.invalidate(db)
+    await db.commit()
+    await db.refresh(category)
     
     return category
 
 
 @router.delete("/category/{category_id}")
-def delete_archive_category(
+async def delete_archive_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> dict:
     """
     删除档案分类
@@ -154,7 +339,7 @@ def delete_archive_category(
     Raises:
         HTTPException: 如果档案分类不存在或包含子分类
     """
-    result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_id))
+    result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == category_id))
     category = result.scalars().first()
     if not category:
         raise HTTPException(
@@ -163,25 +348,24 @@ def delete_archive_category(
         )
     
     # 检查是否有子分类
-    result = db.execute(select(ArchiveCategory).where(ArchiveCategory.parent_id == category_id))
-    children = result.scalars().all()
-    if children:
+    result = await db.execute(select(ArchiveCategory.id).where(ArchiveCategory.parent_id == category_id).limit(1))
+    if result.first() is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with children"
         )
     
     # 检查是否有关联的档案
-    result = db.execute(select(Archive).where(Archive.category_id == category_id))
-    archives = result.scalars().all()
-    if archives:
+    result = await db.execute(select(Archive.id).where(Archive.category_id == category_id).limit(1))
+    if result.first() is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with archives"
         )
     
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await category_tree.invalidate(db)
+    await db.commit()
     
     return {"message": "Archive category deleted successfully"}
 
@@ -189,10 +373,10 @@ def delete_archive_category(
 # 档案管理
 
 @router.post("", response_model=ArchiveSchema)
-def create_archive(
+async def create_archive(
     archive_in: ArchiveCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> ArchiveSchema:
     """
     创建新档案
@@ -206,11 +390,13 @@ def create_archive(
         创建的档案信息
     
     Raises:
-        HTTPException: 如果档案分类不存在
+        HTTPException: 如果档案分类不存在或文件路径位于内容寻址存储中
     """
+    _check_file_path(archive_in.file_path)
+    
     # 检查档案分类是否存在
     if archive_in.category_id:
-        result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == archive_in.category_id))
+        result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == archive_in.category_id))
         category = result.scalars().first()
         if not category:
             raise HTTPException(
@@ -229,21 +415,186 @@ def create_archive(
     )
     
     db.add(db_archive)
-    db.commit()
-    db.refresh(db_archive)
+    await db.commit()
+    await db.refresh(db_archive)
+    invalidate_counts("archive")
     
     return db_archive
 
 
-@router.get("", response_model=List[ArchiveSchema])
-def get_archives(
+@router.post(
+    "/bulk",
+    response_model=ArchiveImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    }
+)
+async def import_archives(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", description="导入格式，ndjson 或 csv，默认按Content-Type判断"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveImportResult:
+    """
+    批量导入档案
+    
+    请求体为每行一个JSON对象的NDJSON，或首行为表头的CSV，字段与创建档案相同。
+    请求体边读取边解析，按批次插入并提交；校验失败的行跳过并在结果中返回行号和原因。
+    
+    Args:
+        request: 请求对象，用于流式读取请求体
+        import_format: 导入格式
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        导入结果
+    
+    Raises:
+        HTTPException: 如果导入格式不受支持或CSV缺少title列
+    """
+    fmt = import_format or detect_format(request.headers.get("content-type"))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Request body must be NDJSON or CSV"
+        )
+    
+    importer = ArchiveImporter(db, fmt, current_user.id)
+    try:
+        result = await importer.run(request.stream())
+    finally:
+        # 中途出错时已提交的批次同样需要刷新总数缓存
+        if importer.inserted:
+            invalidate_counts("archive")
+    
+    return result
+
+
+@router.patch("/bulk", response_model=ArchiveBulkResult)
+async def bulk_update_archives(
+    bulk_in: ArchiveBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveBulkResult:
+    """
+    批量更新档案
+    
+    按ID列表或列表筛选条件选择档案，以一条 UPDATE 语句更新，不逐条读取。
+    
+    Args:
+        bulk_in: 批量更新模型
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        受影响的档案数
+    
+    Raises:
+        HTTPException: 如果未指定选择条件、没有要更新的字段、档案分类不存在或文件路径位于内容寻址存储中
+    """
+    update_data = bulk_in.values.dict(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    _check_file_path(update_data.get("file_path"))
+    
+    # 检查档案分类是否存在
+    if update_data.get("category_id"):
+        result = await db.execute(select(ArchiveCategory.id).where(ArchiveCategory.id == update_data["category_id"]))
+        if result.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Archive category not found"
+            )
+    
+    if bulk_in.dry_run:
+        return {"affected": await _count_bulk(db, bulk_in), "dry_run": True}
+    
+    if "file_path" in update_data:
+        # 档案改为引用其他路径后不再引用原来上传的文件，路径未变的档案保留文件信息；
+        # SET 中的表达式按更新前的行求值
+        path_changed = Archive.file_path.is_distinct_from(update_data["file_path"])
+        await _release_bulk_files(db, bulk_in, path_changed)
+        update_data.update({
+            name: case((path_changed, None), else_=getattr(Archive, name))
+            for name in ("file_hash", "file_name", "file_size")
+        })
+    
+    statement = _select_bulk(update(Archive), bulk_in).values(**update_data, updated_at=datetime.utcnow())
+    result = await db.execute(statement.execution_options(synchronize_session=False))
+    await db.commit()
+    invalidate_counts("archive")
+    
+    return {"affected": result.rowcount, "dry_run": False}
+
+
+@router.delete("/bulk", response_model=ArchiveBulkResult)
+async def bulk_delete_archives(
+    bulk_in: ArchiveBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveBulkResult:
+    """
+    批量删除档案
+    
+    按ID列表或列表筛选条件选择档案，以一条 DELETE 语句删除，不逐条读取。
+    
+    Args:
+        bulk_in: 批量删除模型
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        受影响的档案数
+    
+    Raises:
+        HTTPException: 如果未指定选择条件
+    """
+    if bulk_in.dry_run:
+        return {"affected": await _count_bulk(db, bulk_in), "dry_run": True}
+    
+    # 减少内容寻址存储中文件的引用，取出其他已上传的文件在提交后删除
+    await _release_bulk_files(db, bulk_in)
+    result = await db.execute(
+        _select_bulk(select(Archive.file_path), bulk_in)
+        .where(Archive.file_hash.is_(None), Archive.file_size.is_not(None), Archive.file_path.is_not(None))
+    )
+    file_paths = result.scalars().all()
+    upload_ids = await _delete_archive_uploads(db, _select_bulk(select(Archive.id), bulk_in))
+    
+    result = await db.execute(_select_bulk(delete(Archive), bulk_in).execution_options(synchronize_session=False))
+    file_paths = await _unreferenced_files(db, file_paths)
+    await db.commit()
+    invalidate_counts("archive")
+    for file_path in file_paths:
+        await storage.remove_file(file_path)
+    await _remove_partials(upload_ids)
+    
+    return {"affected": result.rowcount, "dry_run": False}
+
+
+@router.get("", response_model=Union[List[ArchiveSchema], Page[ArchiveSchema]])
+async def get_archives(
     page: int = 1,
     page_size: int = 10,
     name: str = None,
     category_id: int = None,
-    db: Session = Depends(get_db),
+    include_descendants: bool = Query(False, description="按分类筛选时包含子孙分类"),
+    sort: str = Query("id", description="排序字段，前加-表示倒序"),
+    cursor: Optional[str] = Query(None, description="分页游标，传空值获取第一页并启用游标分页"),
+    envelope: bool = Query(False, description="返回包含总数的分页结果"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
-) -> List[ArchiveSchema]:
+) -> Union[List[ArchiveSchema], Page[ArchiveSchema]]:
     """
     获取档案列表
     
@@ -252,35 +603,75 @@ def get_archives(
         page_size: 每页记录数
         name: 档案名称，用于筛选
         category_id: 档案分类ID，用于筛选
+        include_descendants: 是否包含子孙分类下的档案
+        sort: 排序字段
+        cursor: 分页游标，指定时忽略page并返回分页结果
+        envelope: 是否返回包含total和has_more的分页结果
         db: 数据库会话
         current_user: 当前活跃用户
     
     Returns:
-        档案列表
+        档案列表，游标分页或envelope模式下返回分页结果
     """
     # 计算跳过的记录数
     skip = (page - 1) * page_size
     limit = page_size
     
-    query = select(Archive)
+    query = _filter_archives(select(Archive), name, category_id, include_descendants)
     
-    # 如果指定了分类，筛选该分类下的档案
-    if category_id:
-        query = query.where(Archive.category_id == category_id)
+    if cursor is not None:
+        # 游标分页
+        result_page = await paginate_by_cursor(db, query, sort, ARCHIVE_SORT_COLUMNS, Archive.id, cursor, limit)
+    elif envelope:
+        result_page = await paginate_by_offset(db, apply_sort(query, sort, ARCHIVE_SORT_COLUMNS, Archive.id), skip, limit)
+    else:
+        query = apply_sort(query, sort, ARCHIVE_SORT_COLUMNS, Archive.id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        archives = result.scalars().all()
+        return archives
     
-    # 如果指定了名称，筛选包含该名称的档案
-    if name:
-        query = query.where(Archive.title.contains(name))
+    # 总数来自按筛选条件缓存的统计结果
+    if envelope:
+        result_page.total = await cached_count(db, "archive", query, (name, category_id, include_descendants))
+    return result_page
+
+
+@router.get("/export")
+async def export_archives(
+    name: str = None,
+    category_id: int = None,
+    include_descendants: bool = Query(False, description="按分类筛选时包含子孙分类"),
+    sort: str = Query("id", description="排序字段，前加-表示倒序"),
+    export_format: str = Query("csv", alias="format", description="导出格式，csv 或 ndjson"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_permission("archive:read"))
+) -> StreamingResponse:
+    """
+    导出档案
+    
+    筛选条件与档案列表相同，结果通过服务端游标分批读取并以流的形式返回。
+    
+    Args:
+        name: 档案名称，用于筛选
+        category_id: 档案分类ID，用于筛选
+        include_descendants: 是否包含子孙分类下的档案
+        sort: 排序字段
+        export_format: 导出格式
+        db: 数据库会话
+        current_user: 当前活跃用户
     
-    result = db.execute(query.offset(skip).limit(limit))
-    archives = result.scalars().all()
-    return archives
+    Returns:
+        CSV或NDJSON文件的流式响应
+    """
+    query = _filter_archives(select(*Archive.__table__.columns), name, category_id, include_descendants)
+    query = apply_sort(query, sort, ARCHIVE_SORT_COLUMNS, Archive.id)
+    return export_response(db.bind, query, export_format, "archives")
 
 
 @router.get("/{archive_id}", response_model=ArchiveSchema)
-def get_archive(
+async def get_archive(
     archive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> ArchiveSchema:
     """
@@ -297,7 +688,7 @@ def get_archive(
     Raises:
         HTTPException: 如果档案不存在
     """
-    result = db.execute(select(Archive).where(Archive.id == archive_id))
+    result = await db.execute(select(Archive).where(Archive.id == archive_id))
     archive = result.scalars().first()
     if not archive:
         raise HTTPException(
@@ -308,11 +699,11 @@ def get_archive(
 
 
 @router.put("/{archive_id}", response_model=ArchiveSchema)
-def update_archive(
+async def update_archive(
     archive_id: int,
     archive_in: ArchiveUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> ArchiveSchema:
     """
     更新档案信息
@@ -327,9 +718,9 @@ def update_archive(
         更新后的档案信息
     
     Raises:
-        HTTPException: 如果档案不存在或档案分类不存在
+        HTTPException: 如果档案不存在、档案分类不存在或文件路径位于内容寻址存储中
     """
-    result = db.execute(select(Archive).where(Archive.id == archive_id))
+    result = await db.execute(select(Archive).where(Archive.id == archive_id))
     archive = result.scalars().first()
     if not archive:
         raise HTTPException(
@@ -339,7 +730,7 @@ def update_archive(
     
     # 检查档案分类是否存在
     if archive_in.category_id:
-        result = db.execute(select(ArchiveCategory).where(ArchiveCategory.id == archive_in.category_id))
+        result = await db.execute(select(ArchiveCategory).where(ArchiveCategory.id == archive_in.category_id))
         category = result.scalars().first()
         if not category:
             raise HTTPException(
@@ -349,22 +740,30 @@ def update_archive(
     
     # 更新档案信息
     update_data = archive_in.dict(exclude_unset=True)
+    if update_data.get("file_path", archive.file_path) != archive.file_path:
+        _check_file_path(update_data["file_path"])
+    
+    # 档案改为引用其他路径后不再引用原来上传的文件
+    if archive.file_hash and update_data.get("file_path", archive.file_path) != archive.file_path:
+        await blobs.release_blobs(db, {archive.file_hash: 1})
+        update_data.update(file_hash=None, file_name=None, file_size=None)
     
     # 更新档案属性
     for key, value in update_data.items():
         setattr(archive, key, value)
     
-    db.commit()
-    db.refresh(archive)
+    await db.commit()
+    await db.refresh(archive)
+    invalidate_counts("archive")
     
     return archive
 
 
 @router.delete("/{archive_id}")
-def delete_archive(
+async def delete_archive(
     archive_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
 ) -> dict:
     """
     删除档案
@@ -380,7 +779,7 @@ def delete_archive(
     Raises:
         HTTPException: 如果档案不存在
     """
-    result = db.execute(select(Archive).where(Archive.id == archive_id))
+    result = await db.execute(select(Archive).where(Archive.id == archive_id))
     archive = result.scalars().first()
     if not archive:
         raise HTTPException(
@@ -388,7 +787,576 @@ def delete_archive(
             detail="Archive not found"
         )
     
-    db.delete(archive)
-    db.commit()
+    if archive.file_hash:
+        await blobs.release_blobs(db, {archive.file_hash: 1})
+    upload_ids = await _delete_archive_uploads(db, [archive_id])
+    await db.delete(archive)
+    file_paths = await _unreferenced_files(
+        db, [archive.file_path] if not archive.file_hash and archive.file_size is not None else []
+    )
+    await db.commit()
+    invalidate_counts("archive")
+    for file_path in file_paths:
+        await storage.remove_file(file_path)
+    await _remove_partials(upload_ids)
     
     return {"message": "Archive deleted successfully"}
+
+
+# 档案文件
+
+# 断点续传会话已上传部分的哈希状态，键为上传ID，值为(已上传的字节数, 哈希对象)；
+# 不在其中或字节数不一致时（如进程重启）从临时文件重新计算
+_upload_digests: Dict[str, Tuple[int, Any]] = {}
+
+
+async def _get_archive_or_404(db: AsyncSession, archive_id: int) -> Archive:
+    """
+    获取档案，不存在时返回404
+
+    Args:
+        db: 数据库会话
+        archive_id: 档案ID
+
+    Returns:
+        档案实例
+
+    Raises:
+        HTTPException: 如果档案不存在
+    """
+    result = await db.execute(select(Archive).where(Archive.id == archive_id))
+    archive = result.scalars().first()
+    if not archive:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archive not found"
+        )
+    return archive
+
+
+async def _attach_file(
+    db: AsyncSession,
+    archive: Archive,
+    source: Path,
+    file_name: str,
+    file_size: int,
+    file_hash: str
+) -> None:
+    """
+    将写完的临时文件放入内容寻址存储并关联到档案，同时释放档案原有文件的引用
+
+    Args:
+        db: 数据库会话
+        archive: 档案实例
+        source: 临时文件
+        file_name: 原始文件名
+        file_size: 文件大小（字节）
+        file_hash: 文件内容的SHA-256
+    """
+    old_file_hash, old_file_path, old_file_size = archive.file_hash, archive.file_path, archive.file_size
+    file_path = await blobs.acquire_blob(db, file_hash, file_size, source)
+    if old_file_hash:
+        await blobs.release_blobs(db, {old_file_hash: 1})
+    
+    archive.file_path = file_path
+    archive.file_name = file_name
+    archive.file_size = file_size
+    archive.file_hash = file_hash
+    archive.updated_at = datetime.utcnow()
+    file_paths = await _unreferenced_files(
+        db, [old_file_path] if not old_file_hash and old_file_size is not None else []
+    )
+    await db.commit()
+    await db.refresh(archive)
+    
+    for old_path in file_paths:
+        await storage.remove_file(old_path)
+
+
+async def _store_upload(db: AsyncSession, archive: Archive, chunks, file_name: str) -> Archive:
+    """
+    将数据流写入临时文件后关联到档案，写入失败时删除临时文件
+
+    Args:
+        db: 数据库会话
+        archive: 档案实例
+        chunks: 文件数据块
+        file_name: 原始文件名
+
+    Returns:
+        更新后的档案
+    """
+    name = uuid.uuid4().hex
+    source = storage.partial_path(name)
+    digest = hashlib.sha256()
+    try:
+        file_size = await storage.write_stream(chunks, source, settings.UPLOAD_MAX_SIZE, digest=digest)
+        await _attach_file(db, archive, source, file_name, file_size, digest.hexdigest())
+    finally:
+        await storage.remove_partial(name)
+    return archive
+
+
+@router.post("/{archive_id}/file", response_model=ArchiveSchema)
+async def upload_archive_file(
+    archive_id: int,
+    file: UploadFile = File(..., description="档案文件"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveSchema:
+    """
+    以multipart表单上传档案文件，替换档案已有的文件
+    
+    Args:
+        archive_id: 档案ID
+        file: 上传的文件
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        更新后的档案信息
+    
+    Raises:
+        HTTPException: 如果档案不存在或文件超过大小限制
+    """
+    archive = await _get_archive_or_404(db, archive_id)
+    return await _store_upload(db, archive, storage.iter_upload_file(file), file.filename or "file")
+
+
+@router.put(
+    "/{archive_id}/file",
+    response_model=ArchiveSchema,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    }
+)
+async def put_archive_file(
+    archive_id: int,
+    request: Request,
+    file_name: str = Query(..., description="原始文件名"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveSchema:
+    """
+    以请求体直接上传档案文件，请求体边接收边写入磁盘，替换档案已有的文件
+    
+    Args:
+        archive_id: 档案ID
+        request: 请求对象，用于流式读取请求体
+        file_name: 原始文件名
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        更新后的档案信息
+    
+    Raises:
+        HTTPException: 如果档案不存在或文件超过大小限制
+    """
+    archive = await _get_archive_or_404(db, archive_id)
+    return await _store_upload(db, archive, request.stream(), file_name)
+
+
+@router.get("/{archive_id}/file")
+async def download_archive_file(
+    archive_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+) -> FileResponse:
+    """
+    下载档案文件
+    
+    支持Range请求，可断点续传或按范围读取；服务器支持ASGI pathsend扩展时由服务器直接发送文件。
+    
+    Args:
+        archive_id: 档案ID
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        文件响应
+    
+    Raises:
+        HTTPException: 如果档案不存在或没有文件
+    """
+    archive = await _get_archive_or_404(db, archive_id)
+    path = storage.resolve_path(archive.file_path)
+    if path is None or not await run_in_threadpool(path.is_file):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archive file not found"
+        )
+    return FileResponse(path, filename=archive.file_name or path.name)
+
+
+def _upload_status(upload: ArchiveUpload, offset: int, completed: bool = False) -> dict:
+    """组装断点续传会话的响应"""
+    return {**upload.model_dump(), "offset": offset, "completed": completed}
+
+
+async def _get_upload_or_404(db: AsyncSession, upload_id: str) -> ArchiveUpload:
+    """
+    获取断点续传会话，不存在时返回404
+
+    Args:
+        db: 数据库会话
+        upload_id: 上传ID
+
+    Returns:
+        断点续传会话
+
+    Raises:
+        HTTPException: 如果会话不存在
+    """
+    upload = await db.get(ArchiveUpload, upload_id)
+    if upload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+async def _remove_partials(upload_ids: List[str]) -> None:
+    """删除已结束的断点续传会话的临时文件和哈希状态，须在删除会话的事务提交后调用"""
+    for upload_id in upload_ids:
+        _upload_digests.pop(upload_id, None)
+        await storage.remove_partial(upload_id)
+
+
+async def _delete_archive_uploads(db: AsyncSession, archive_ids) -> List[str]:
+    """
+    删除档案的断点续传会话，须在删除档案的同一事务中执行
+
+    Args:
+        db: 数据库会话
+        archive_ids: 档案ID列表或查询档案ID的语句
+
+    Returns:
+        被删除会话的上传ID，提交后以 _remove_partials 删除其临时文件
+    """
+    result = await db.execute(select(ArchiveUpload.id).where(ArchiveUpload.archive_id.in_(archive_ids)))
+    upload_ids = list(result.scalars().all())
+    if upload_ids:
+        await db.execute(delete(ArchiveUpload).where(ArchiveUpload.id.in_(upload_ids)))
+    return upload_ids
+
+
+def _upload_unlocked(now: datetime):
+    """断点续传会话没有被请求占用（写入租约为空或已过期）的条件"""
+    return or_(ArchiveUpload.locked_until.is_(None), ArchiveUpload.locked_until < now)
+
+
+class _UploadLease:
+    """
+    断点续传会话的写入租约
+
+    同一会话同时只允许一个请求写入，租约记录在数据库中，多个进程间同样互斥。
+    以条件 UPDATE 占用租约，写入期间随数据块到达每过一半时长续期一次；
+    续期时租约已被其他请求占用（本请求停顿超过租约时长）则中止写入。
+    """
+
+    def __init__(self, db: AsyncSession, upload_id: str):
+        """
+        Args:
+            db: 数据库会话
+            upload_id: 上传ID
+        """
+        self.db = db
+        self.upload_id = upload_id
+        self.until: Optional[datetime] = None
+        self._renew_at = 0.0
+
+    async def acquire(self) -> bool:
+        """
+        占用租约
+
+        Returns:
+            是否占用成功，会话正在被其他请求写入时为False
+        """
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=settings.UPLOAD_LEASE_SECONDS)
+        result = await self.db.execute(
+            update(ArchiveUpload)
+            .where(ArchiveUpload.id == self.upload_id, _upload_unlocked(now))
+            .values(locked_until=until)
+        )
+        await self.db.commit()
+        if not result.rowcount:
+            return False
+        self._hold(until)
+        return True
+
+    async def renew(self) -> None:
+        """
+        续期租约
+
+        Raises:
+            HTTPException: 如果租约已被其他请求占用或会话已被删除
+        """
+        until = datetime.utcnow() + timedelta(seconds=settings.UPLOAD_LEASE_SECONDS)
+        result = await self.db.execute(
+            update(ArchiveUpload)
+            .where(ArchiveUpload.id == self.upload_id, ArchiveUpload.locked_until == self.until)
+            .values(locked_until=until)
+        )
+        await self.db.commit()
+        if not result.rowcount:
+            self.until = None
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload lease lost"
+            )
+        self._hold(until)
+
+    async def keep_alive(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """逐块转发数据，到达续期时间时先续期租约"""
+        async for chunk in chunks:
+            if time.monotonic() >= self._renew_at:
+                await self.renew()
+            yield chunk
+
+    async def release(self) -> None:
+        """释放租约，会话已结束或租约已失效时不做任何事"""
+        if self.until is None:
+            return
+        try:
+            await self.db.rollback()
+            await self.db.execute(
+                update(ArchiveUpload)
+                .where(ArchiveUpload.id == self.upload_id, ArchiveUpload.locked_until == self.until)
+                .values(locked_until=None)
+            )
+            await self.db.commit()
+        except Exception:
+            # 释放失败时等待租约到期
+            pass
+        self.until = None
+
+    def _hold(self, until: datetime) -> None:
+        self.until = until
+        self._renew_at = time.monotonic() + settings.UPLOAD_LEASE_SECONDS / 2
+
+
+async def _purge_expired_uploads(db: AsyncSession) -> None:
+    """删除超过保留时间仍未完成的断点续传会话及其临时文件"""
+    now = datetime.utcnow()
+    expired_before = now - timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+    result = await db.execute(
+        select(ArchiveUpload.id).where(ArchiveUpload.created_at < expired_before, _upload_unlocked(now))
+    )
+    candidates = result.scalars().all()
+    if not candidates:
+        return
+    # 逐个带条件删除，查询之后被其他请求占用的会话保留
+    expired = []
+    for upload_id in candidates:
+        deleted = await db.execute(
+            delete(ArchiveUpload).where(ArchiveUpload.id == upload_id, _upload_unlocked(now))
+        )
+        if deleted.rowcount:
+            expired.append(upload_id)
+    await db.commit()
+    await _remove_partials(expired)
+
+
+@router.post("/{archive_id}/uploads", response_model=ArchiveUploadSchema, status_code=status.HTTP_201_CREATED)
+async def create_archive_upload(
+    archive_id: int,
+    upload_in: ArchiveUploadCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveUploadSchema:
+    """
+    创建断点续传会话，之后按顺序调用追加接口上传文件的各个分块
+    
+    Args:
+        archive_id: 档案ID
+        upload_in: 文件名和文件总大小
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        断点续传会话
+    
+    Raises:
+        HTTPException: 如果档案不存在或文件大小无效
+    """
+    await _get_archive_or_404(db, archive_id)
+    if upload_in.file_size <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File size must be positive"
+        )
+    if upload_in.file_size > settings.UPLOAD_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail="File is larger than allowed"
+        )
+    
+    await _purge_expired_uploads(db)
+    
+    upload = ArchiveUpload(
+        id=uuid.uuid4().hex,
+        archive_id=archive_id,
+        file_name=upload_in.file_name,
+        file_size=upload_in.file_size,
+        created_by=current_user.id
+    )
+    await run_in_threadpool(storage.partial_path(upload.id).touch)
+    db.add(upload)
+    await db.commit()
+    await db.refresh(upload)
+    
+    return _upload_status(upload, 0)
+
+
+@router.get("/uploads/{upload_id}", response_model=ArchiveUploadSchema)
+async def get_archive_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveUploadSchema:
+    """
+    获取断点续传会话及已上传的字节数，客户端据此从 offset 处继续上传
+    
+    Args:
+        upload_id: 上传ID
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        断点续传会话
+    
+    Raises:
+        HTTPException: 如果会话不存在
+    """
+    upload = await _get_upload_or_404(db, upload_id)
+    offset = await run_in_threadpool(os.path.getsize, storage.partial_path(upload_id))
+    return _upload_status(upload, offset)
+
+
+@router.patch(
+    "/uploads/{upload_id}",
+    response_model=ArchiveUploadSchema,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    }
+)
+async def append_archive_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., description="本次分块在文件中的起始位置，须等于已上传的字节数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> ArchiveUploadSchema:
+    """
+    向断点续传会话追加一个分块
+    
+    请求体边接收边追加到临时文件；连接中断时已接收的部分保留，客户端查询 offset 后继续上传。
+    上传完整个文件后自动关联到档案并结束会话。
+    
+    Args:
+        upload_id: 上传ID
+        request: 请求对象，用于流式读取请求体
+        upload_offset: Upload-Offset 请求头
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        追加后的断点续传会话
+    
+    Raises:
+        HTTPException: 如果会话不存在、正在被其他请求写入、偏移量不一致或超出文件大小
+    """
+    upload = await _get_upload_or_404(db, upload_id)
+    lease = _UploadLease(db, upload_id)
+    if not await lease.acquire():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is in progress"
+        )
+    
+    source = storage.partial_path(upload_id)
+    try:
+        offset = await run_in_threadpool(os.path.getsize, source)
+        if upload_offset != offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload offset mismatch, expected {offset}"
+            )
+        
+        # 续写上次的哈希状态，出错时丢弃，下次从临时文件重新计算
+        cached = _upload_digests.pop(upload_id, None)
+        if cached is not None and cached[0] == offset:
+            digest = cached[1]
+        else:
+            digest = await storage.hash_file(source)
+            await lease.renew()
+        try:
+            offset += await storage.write_stream(
+                lease.keep_alive(request.stream()), source, upload.file_size - offset, append=True, digest=digest
+            )
+        except HTTPException:
+            # 超出声明的文件大小时丢弃本次分块；租约已失效时文件归其他请求写入，不再改动
+            if lease.until is not None:
+                await run_in_threadpool(os.truncate, source, upload_offset)
+            raise
+        
+        if offset < upload.file_size:
+            _upload_digests[upload_id] = (offset, digest)
+            return _upload_status(upload, offset)
+        
+        # 文件已完整，关联到档案并结束会话；写入期间档案被删除时丢弃临时文件
+        try:
+            archive = await _get_archive_or_404(db, upload.archive_id)
+        except HTTPException:
+            await _remove_partials([upload_id])
+            raise
+        await db.delete(upload)
+        await _attach_file(db, archive, source, upload.file_name, upload.file_size, digest.hexdigest())
+        return _upload_status(upload, offset, completed=True)
+    finally:
+        await lease.release()
+
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_archive_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("archive:write"))
+) -> dict:
+    """
+    取消断点续传会话并删除已上传的部分
+    
+    Args:
+        upload_id: 上传ID
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        取消成功消息
+    
+    Raises:
+        HTTPException: 如果会话不存在或正在被写入
+    """
+    await _get_upload_or_404(db, upload_id)
+    result = await db.execute(
+        delete(ArchiveUpload).where(ArchiveUpload.id == upload_id, _upload_unlocked(datetime.utcnow()))
+    )
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is in progress"
+        )
+    await db.commit()
+    _upload_digests.pop(upload_id, None)
+    await storage.remove_partial(upload_id)
+    
+    return {"message": "Upload cancelled successfully"}
@@ -1,22 +1,25 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.pagination import invalidate_counts
+from app.core.security import create_access_token, verify_token
 from app.models.user import User, Role
-from app.schemas.user import Token, User as UserSchema, UserCreate
-from app.api.deps import get_current_active_user
+from app.schemas.user import Token, User as UserSchema, UserRegister
+from app.api.deps import get_current_active_user, invalidate_user_cache, oauth2_scheme
+from app.services.password import DUMMY_PASSWORD_HASH, password_hasher
+from app.services.revocation import token_blocklist
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Token:
     """
     用户登录
@@ -29,20 +32,34 @@ def login(
         包含访问令牌的响应
     
     Raises:
-        HTTPException: 如果用户名或密码错误
+        HTTPException: 如果用户名或密码错误，或用户已被禁用
     """
-    # 暂时使用硬编码的方式验证用户名和密码
-    if form_data.username != "admin" or form_data.password != "admin123":
+    incorrect_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect username or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    result = await db.execute(select(User).where(User.username == form_data.username))
+    user = result.scalars().first()
+    if not user:
+        # 用户不存在时同样计算一次哈希，使响应耗时与密码错误时一致
+        await password_hasher.verify_password(form_data.password, DUMMY_PASSWORD_HASH)
+        raise incorrect_credentials
+    
+    if not await password_hasher.verify_password(form_data.password, user.password):
+        raise incorrect_credentials
+    
+    if not user.status:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
         )
     
-    # 创建访问令牌
+    # 创建访问令牌，令牌版本用于撤销已签发的令牌
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": "admin", "id": 1},
+        data={"sub": user.username, "id": user.id, "ver": user.token_version},
         expires_delta=access_token_expires
     )
     
@@ -50,24 +67,45 @@ def login(
 
 
 @router.post("/logout")
-def logout(
+async def logout(
+    all_sessions: bool = False,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> dict:
     """
     用户登出
     
     Args:
+        all_sessions: 是否同时使该用户的所有令牌失效
+        token: 当前请求的JWT令牌
+        db: 数据库会话
         current_user: 当前活跃用户
     
     Returns:
         登出成功消息
     """
-    # JWT是无状态的，登出只需客户端删除令牌即可
+    payload = verify_token(token) or {}
+    
+    if all_sessions:
+        # 递增令牌版本，该用户已签发的令牌全部失效
+        user = await db.get(User, current_user.id)
+        user.token_version += 1
+        await db.commit()
+        invalidate_user_cache(current_user.id)
+    elif payload.get("jti"):
+        await token_blocklist.revoke(
+            db,
+            jti=payload["jti"],
+            user_id=current_user.id,
+            expires_at=datetime.utcfromtimestamp(payload["exp"])
+        )
+    
     return {"message": "Successfully logged out"}
 
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user_info(
+async def get_current_user_info(
     current_user: User = Depends(get_current_active_user)
 ) -> UserSchema:
     """
@@ -83,15 +121,15 @@ def get_current_user_info(
 
 
 @router.post("/register", response_model=UserSchema)
-def register(
-    user_in: UserCreate,
-    db: Session = Depends(get_db)
+async def register(
+    user_in: UserRegister,
+    db: AsyncSession = Depends(get_db)
 ) -> UserSchema:
     """
-    用户注册
+    用户注册，注册的用户没有角色，需由管理员分配
     
     Args:
-        user_in: 创建用户模型
+        user_in: 用户注册模型
         db: 数据库会话
     
     Returns:
@@ -101,7 +139,7 @@ def register(
         HTTPException: 如果用户名或邮箱已存在
     """
     # 检查用户名是否已存在
-    result = db.execute(select(User).where(User.username == user_in.username))
+    result = await db.execute(select(User).where(User.username == user_in.username))
     if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -109,7 +147,7 @@ def register(
         )
     
     # 检查邮箱是否已存在
-    result = db.execute(select(User).where(User.email == user_in.email))
+    result = await db.execute(select(User).where(User.email == user_in.email))
     if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -117,17 +155,17 @@ def register(
         )
     
     # 创建用户
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await password_hasher.hash_password(user_in.password)
     db_user = User(
         username=user_in.username,
         password=hashed_password,
         name=user_in.name,
-        email=user_in.email,
-        role_id=user_in.role_id
+        email=user_in.email
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_counts("user")
     
     return db_user
@@ -1,21 +1,43 @@
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_db, get_replica_db, recently_wrote
+from app.core.permissions import get_role_mask, permission_bit
 from app.core.security import verify_token
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.revocation import token_blocklist
 
 # OAuth2密码承载令牌
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# 已认证用户缓存，键为用户ID，值为与会话分离的用户实例
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.USER_CACHE_TTL_SECONDS)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+
+def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+    """
+    使用户缓存失效，在用户或角色变更后调用
+
+    Args:
+        user_id: 用户ID，为None时清空全部缓存
+    """
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.pop(user_id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     """
     获取当前用户
     
+    用户记录按ID缓存，撤销令牌集合定期增量同步，通常不访问数据库。
+    
     Args:
         token: JWT令牌
         db: 数据库会话
@@ -41,12 +63,32 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
     
     token_data = TokenData(username=username, user_id=payload.get("id"))
+    if token_data.user_id is None:
+        raise credentials_exception
     
-    # 查询用户
-    result = db.execute(select(User).where(User.username == token_data.username))
-    user = result.scalars().first()
+    # 已登出的令牌，检查只在内存中进行
+    jti = payload.get("jti")
+    if jti is not None and await token_blocklist.is_revoked(db, jti):
+        raise credentials_exception
     
+    # 优先从缓存读取用户
+    user = user_cache.get(token_data.user_id)
     if user is None:
+        result = await db.execute(select(User).where(User.id == token_data.user_id))
+        user = result.scalars().first()
+        if user is not None:
+            # 与会话分离后缓存，供后续请求直接使用
+            db.expunge(user)
+            user_cache.set(token_data.user_id, user)
+    
+    if user is None or user.username != token_data.username:
+        raise credentials_exception
+    
+    # 记录会话所属用户，提交写入后据此让该用户的读请求暂时走主库
+    db.info["user_id"] = user.id
+    
+    # 令牌版本不一致说明令牌已被撤销
+    if payload.get("ver", 0) != user.token_version:
         raise credentials_exception
     
     if not user.status:
@@ -58,7 +100,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     获取当前活跃用户
     
@@ -71,3 +113,58 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     if not current_user.status:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_read_db(
+    db: AsyncSession = Depends(get_db),
+    replica_db: Optional[AsyncSession] = Depends(get_replica_db),
+    current_user: User = Depends(get_current_user)
+) -> AsyncSession:
+    """
+    获取读请求使用的数据库会话
+    
+    配置了只读副本时使用副本会话；当前用户在读己之写窗口内提交过写入时
+    仍使用主库会话，避免读到复制延迟前的旧数据。
+    
+    Args:
+        db: 主库会话
+        replica_db: 只读副本会话，未配置副本时为None
+        current_user: 当前用户
+    
+    Returns:
+        数据库会话
+    """
+    if replica_db is None or recently_wrote(current_user.id):
+        return db
+    return replica_db
+
+
+def require_permission(permission: str):
+    """
+    生成校验当前用户权限的依赖
+    
+    角色的权限掩码按角色ID缓存，校验只需一次位运算。
+    
+    Args:
+        permission: 权限名称，如 "archive:write"
+    
+    Returns:
+        返回当前活跃用户的依赖函数
+    
+    Raises:
+        ValueError: 如果权限名称未注册
+    """
+    bit = permission_bit(permission)
+    
+    async def dependency(
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+    ) -> User:
+        if not (await get_role_mask(db, current_user.role_id)) & bit:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    
+    return dependency
@@ -1,31 +1,137 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from sqlmodel import select
 from datetime import datetime
 from app.core.database import get_db
+from app.core.pagination import (
+    apply_sort,
+    cached_count,
+    invalidate_counts,
+    paginate_by_cursor,
+    paginate_by_offset
+)
 from app.models.knowledge import KnowledgeArticle, KnowledgeCategory, KnowledgeTag
 from app.schemas.knowledge import (
     KnowledgeArticle as KnowledgeArticleSchema,
     KnowledgeArticleCreate,
     KnowledgeArticleUpdate,
+    KnowledgeArticleListItem,
     KnowledgeCategory as KnowledgeCategorySchema,
     KnowledgeCategoryCreate,
     KnowledgeCategoryUpdate,
+    KnowledgeCategoryTree as KnowledgeCategoryTreeSchema,
     KnowledgeTag as KnowledgeTagSchema,
     KnowledgeTagCreate
 )
-from app.api.deps import get_current_active_user
+from app.schemas.common import Page
+from app.api.deps import get_current_active_user, get_read_db, require_permission
 from app.models.user import User
+from app.services import category as category_service
+from app.services import search as search_service
+from app.services import tags as tag_service
+from app.services.export import export_response
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
+# 知识文章列表允许的排序字段
+ARTICLE_SORT_COLUMNS = {
+    "id": KnowledgeArticle.id,
+    "created_at": KnowledgeArticle.created_at,
+    "updated_at": KnowledgeArticle.updated_at,
+    "title": KnowledgeArticle.title,
+}
+
+# 列表接口可返回的字段，正文只在详情接口中读取
+ARTICLE_LIST_FIELDS = tuple(KnowledgeArticleListItem.model_fields)
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    解析稀疏字段集参数
+
+    Args:
+        fields: 逗号分隔的字段名
+
+    Returns:
+        字段名列表，始终以id开头以便客户端打开详情，未指定时返回空列表
+
+    Raises:
+        HTTPException: 如果包含列表接口不支持的字段
+    """
+    if not fields:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in ARTICLE_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported fields: {', '.join(unknown)}"
+        )
+    if not names:
+        return []
+    return ["id"] + [name for name in names if name != "id"]
+
+
+def _filter_articles(
+    query,
+    category_id: Optional[int],
+    include_descendants: bool,
+    article_status: Optional[str],
+    tag: Optional[str],
+    search: Optional[str]
+):
+    """
+    为知识文章查询附加列表和导出共用的筛选条件
+
+    Args:
+        query: 知识文章查询
+        category_id: 知识分类ID
+        include_descendants: 是否包含子孙分类下的文章
+        article_status: 文章状态
+        tag: 标签名称
+        search: 搜索关键词，支持FTS5时按相关度排序
+
+    Returns:
+        附加筛选条件后的查询
+    """
+    if category_id:
+        if include_descendants:
+            query = query.where(
+                KnowledgeArticle.category_id.in_(category_service.subtree_ids(KnowledgeCategory, category_id))
+            )
+        else:
+            query = query.where(KnowledgeArticle.category_id == category_id)
+    
+    if article_status:
+        query = query.where(KnowledgeArticle.status == article_status)
+    
+    if tag:
+        # 通过标签关联表精确匹配标签
+        query = tag_service.filter_by_tag(query, tag)
+    
+    if search:
+        if search_service.is_available():
+            # 使用FTS5全文索引，按相关度排序
+            query = search_service.apply_search(query, search)
+        else:
+            # 不支持FTS5时回退为简单的标题和内容搜索
+            query = query.where(
+                (KnowledgeArticle.title.contains(search)) |
+                (KnowledgeArticle.content.contains(search)) |
+                (KnowledgeArticle.tags.contains(search))
+            )
+    return query
+
 
 # 知识标签管理
 
 @router.get("/tag", response_model=List[KnowledgeTagSchema])
-def get_knowledge_tags(
-    db: Session = Depends(get_db),
+async def get_knowledge_tags(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> List[KnowledgeTagSchema]:
     """
@@ -38,18 +144,43 @@ def get_knowledge_tags(
     Returns:
         知识标签列表
     """
-    result = db.execute(select(KnowledgeTag))
+    result = await db.execute(select(KnowledgeTag))
     tags = result.scalars().all()
     return tags
 
 
+@router.post("/tag/recount")
+async def recount_knowledge_tags(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
+) -> dict:
+    """
+    根据文章标签关联重新计算所有标签的使用次数
+
+    Args:
+        db: 数据库会话
+        current_user: 当前活跃用户
+
+    Returns:
+        更新的标签数量
+    """
+    updated = await tag_service.recount_tag_usage(db)
+    await db.commit()
+
+    return {"message": "Knowledge tag usage recounted successfully", "updated": updated}
+
+
+# 知识分类树缓存
+category_tree = category_service.CategoryTreeCache(KnowledgeCategory, KnowledgeCategoryTreeSchema)
+
+
 # 知识分类管理
 
 @router.post("/category", response_model=KnowledgeCategorySchema)
-def create_knowledge_category(
+async def create_knowledge_category(
     category_in: KnowledgeCategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeCategorySchema:
     """
     创建知识分类
@@ -63,8 +194,9 @@ def create_knowledge_category(
         创建的知识分类信息
     """
     # 检查父分类是否存在
+    parent = None
     if category_in.parent_id:
-        result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_in.parent_id))
+        result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_in.parent_id))
         parent = result.scalars().first()
         if not parent:
             raise HTTPException(
@@ -80,15 +212,17 @@ def create_knowledge_category(
     )
     
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await category_service.assign_path(db, db_category, parent)
+    await category_tree.invalidate(db)
+    await db.commit()
+    await db.refresh(db_category)
     
     return db_category
 
 
 @router.get("/category", response_model=List[KnowledgeCategorySchema])
-def get_knowledge_categories(
-    db: Session = Depends(get_db),
+async def get_knowledge_categories(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> List[KnowledgeCategorySchema]:
     """
@@ -101,17 +235,35 @@ def get_knowledge_categories(
     Returns:
         知识分类列表
     """
-    result = db.execute(select(KnowledgeCategory))
+    result = await db.execute(select(KnowledgeCategory))
     categories = result.scalars().all()
     return categories
 
 
+@router.get("/category/tree", response_model=List[KnowledgeCategoryTreeSchema])
+async def get_knowledge_category_tree(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """
+    获取知识分类树
+    
+    Args:
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        嵌套的知识分类树，直接返回缓存的JSON
+    """
+    return Response(content=await category_tree.get(db), media_type="application/json")
+
+
 @router.put("/category/{category_id}", response_model=KnowledgeCategorySchema)
-def update_knowledge_category(
+async def update_knowledge_category(
     category_id: int,
     category_in: KnowledgeCategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeCategorySchema:
     """
     更新知识分类
@@ -126,9 +278,9 @@ def update_knowledge_category(
         更新后的知识分类信息
     
     Raises:
-        HTTPException: 如果知识分类不存在
+        HTTPException: 如果知识分类不存在或新的父分类是其自身或子孙分类
     """
-    result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_id))
+    result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_id))
     category = result.scalars().first()
     if not category:
         raise HTTPException(
@@ -137,8 +289,9 @@ def update_knowledge_category(
         )
     
     # 检查父分类是否存在
+    parent = None
     if category_in.parent_id:
-        result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_in.parent_id))
+        result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_in.parent_id))
         parent = result.scalars().first()
         if not parent:
             raise HTTPException(
@@ -149,21 +302,26 @@ def update_knowledge_category(
     # 更新知识分类信息
     update_data = category_in.dict(exclude_unset=True)
     
+    # 父分类变更时检查是否成环，并改写整棵子树的路径
+    if "parent_id" in update_data and update_data["parent_id"] != category.parent_id:
+        await category_service.move_subtree(db, KnowledgeCategory, category, parent)
+    
     # 更新知识分类属性
     for key, value in update_data.items():
         setattr(category, key, value)
     
-    db.commit()
-    db.refresh(category)
+    await category_tree.invalidate(db)
+    await db.commit()
+    await db.refresh(category)
     
     return category
 
 
 @router.delete("/category/{category_id}")
-def delete_knowledge_category(
+async def delete_knowledge_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> dict:
     """
     删除知识分类
@@ -179,7 +337,7 @@ def delete_knowledge_category(
     Raises:
         HTTPException: 如果知识分类不存在或包含子分类
     """
-    result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_id))
+    result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == category_id))
     category = result.scalars().first()
     if not category:
         raise HTTPException(
@@ -188,25 +346,24 @@ def delete_knowledge_category(
         )
     
     # 检查是否有子分类
-    result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.parent_id == category_id))
-    children = result.scalars().all()
-    if children:
+    result = await db.execute(select(KnowledgeCategory.id).where(KnowledgeCategory.parent_id == category_id).limit(1))
+    if result.first() is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with children"
         )
     
     # 检查是否有关联的知识文章
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.category_id == category_id))
-    articles = result.scalars().all()
-    if articles:
+    result = await db.execute(select(KnowledgeArticle.id).where(KnowledgeArticle.category_id == category_id).limit(1))
+    if result.first() is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category with articles"
         )
     
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await category_tree.invalidate(db)
+    await db.commit()
     
     return {"message": "Knowledge category deleted successfully"}
 
@@ -214,10 +371,10 @@ def delete_knowledge_category(
 # 知识文章管理
 
 @router.post("", response_model=KnowledgeArticleSchema)
-def create_knowledge_article(
+async def create_knowledge_article(
     article_in: KnowledgeArticleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeArticleSchema:
     """
     创建知识文章
@@ -235,7 +392,7 @@ def create_knowledge_article(
     """
     # 检查知识分类是否存在
     if article_in.category_id:
-        result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == article_in.category_id))
+        result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == article_in.category_id))
         category = result.scalars().first()
         if not category:
             raise HTTPException(
@@ -243,21 +400,6 @@ def create_knowledge_article(
                 detail="Knowledge category not found"
             )
     
-    # 处理标签
-    if article_in.tags:
-        # 分割标签
-        tags = [tag.strip() for tag in article_in.tags.split(",") if tag.strip()]
-        # 更新标签使用次数
-        for tag_name in tags:
-            result = db.execute(select(KnowledgeTag).where(KnowledgeTag.name == tag_name))
-            tag = result.scalars().first()
-            if tag:
-                tag.usage_count += 1
-            else:
-                # 创建新标签
-                new_tag = KnowledgeTag(name=tag_name, usage_count=1)
-                db.add(new_tag)
-    
     # 创建知识文章
     db_article = KnowledgeArticle(
         title=article_in.title,
@@ -274,22 +416,37 @@ def create_knowledge_article(
         db_article.published_at = datetime.utcnow()
     
     db.add(db_article)
-    db.commit()
-    db.refresh(db_article)
+    await db.flush()
+    
+    # 处理标签关联和使用次数
+    await tag_service.sync_article_tags(db, db_article.id, [], tag_service.parse_tags(article_in.tags))
+    
+    # 同步全文索引
+    await search_service.index_article(db, db_article)
+    
+    await db.commit()
+    await db.refresh(db_article)
+    invalidate_counts("knowledge_article")
     
     return db_article
 
 
-@router.get("", response_model=List[KnowledgeArticleSchema])
-def get_knowledge_articles(
+@router.get("", response_model=Union[List[KnowledgeArticleListItem], Page[KnowledgeArticleListItem]])
+async def get_knowledge_articles(
     skip: int = 0,
     limit: int = 100,
     category_id: Optional[int] = None,
-    status: Optional[str] = None,
+    include_descendants: bool = Query(False, description="按分类筛选时包含子孙分类"),
+    article_status: Optional[str] = Query(None, alias="status", description="文章状态"),
+    tag: Optional[str] = Query(None, description="标签名称"),
     search: Optional[str] = Query(None, description="搜索关键词"),
-    db: Session = Depends(get_db),
+    sort: str = Query("id", description="排序字段，前加-表示倒序"),
+    cursor: Optional[str] = Query(None, description="分页游标，传空值获取第一页并启用游标分页"),
+    envelope: bool = Query(False, description="返回包含总数的分页结果"),
+    fields: Optional[str] = Query(None, description="返回的字段，逗号分隔"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
-) -> List[KnowledgeArticleSchema]:
+) -> Union[List[KnowledgeArticleListItem], Page[KnowledgeArticleListItem]]:
     """
     获取知识文章列表
     
@@ -297,40 +454,112 @@ def get_knowledge_articles(
         skip: 跳过的记录数
         limit: 返回的最大记录数
         category_id: 知识分类ID，用于筛选
-        status: 文章状态，用于筛选
+        include_descendants: 是否包含子孙分类下的文章
+        article_status: 文章状态，用于筛选
+        tag: 标签名称，用于筛选
         search: 搜索关键词
+        sort: 排序字段，搜索时作为相关度之后的次级排序
+        cursor: 分页游标，指定时忽略skip并返回分页结果
+        envelope: 是否返回包含total和has_more的分页结果
+        fields: 稀疏字段集，只查询并返回指定字段
         db: 数据库会话
         current_user: 当前活跃用户
     
     Returns:
-        知识文章列表
+        知识文章列表（不含正文），游标分页或envelope模式下返回分页结果
     """
-    query = select(KnowledgeArticle)
+    selected_fields = _parse_fields(fields)
     
-    # 应用筛选条件
-    if category_id:
-        query = query.where(KnowledgeArticle.category_id == category_id)
+    # 只加载列表需要的列，正文等大字段延迟到详情接口读取
+    load_fields = set(selected_fields or ARTICLE_LIST_FIELDS) | {sort.lstrip("-")}
+    query = select(KnowledgeArticle).options(
+        load_only(*(getattr(KnowledgeArticle, name) for name in load_fields if name in ARTICLE_LIST_FIELDS))
+    )
     
-    if status:
-        query = query.where(KnowledgeArticle.status == status)
+    if cursor is not None and search:
+        # 按相关度排序时没有可作为游标的稳定排序键，只能使用偏移分页
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported with search"
+        )
     
-    if search:
-        # 简单的标题和内容搜索
-        query = query.where(
-            (KnowledgeArticle.title.contains(search)) |
-            (KnowledgeArticle.content.contains(search)) |
-            (KnowledgeArticle.tags.contains(search))
+    # 应用筛选条件
+    query = _filter_articles(query, category_id, include_descendants, article_status, tag, search)
+    
+    if cursor is not None:
+        # 游标分页
+        result_page = await paginate_by_cursor(db, query, sort, ARTICLE_SORT_COLUMNS, KnowledgeArticle.id, cursor, limit)
+    elif envelope:
+        result_page = await paginate_by_offset(
+            db, apply_sort(query, sort, ARTICLE_SORT_COLUMNS, KnowledgeArticle.id), skip, limit
+        )
+    else:
+        query = apply_sort(query, sort, ARTICLE_SORT_COLUMNS, KnowledgeArticle.id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        articles = result.scalars().all()
+        if selected_fields:
+            return JSONResponse(jsonable_encoder(
+                [{name: getattr(article, name) for name in selected_fields} for article in articles]
+            ))
+        return articles
+    
+    # 总数来自按筛选条件缓存的统计结果
+    if envelope:
+        result_page.total = await cached_count(
+            db, "knowledge_article", query, (category_id, include_descendants, article_status, tag, search)
         )
     
-    result = db.execute(query.offset(skip).limit(limit))
-    articles = result.scalars().all()
-    return articles
+    if selected_fields:
+        # 稀疏字段集直接序列化，避免按完整列表项模型校验
+        result_page.items = [
+            {name: getattr(article, name) for name in selected_fields} for article in result_page.items
+        ]
+        return JSONResponse(jsonable_encoder(result_page))
+    return result_page
+
+
+@router.get("/export")
+async def export_knowledge_articles(
+    category_id: Optional[int] = None,
+    include_descendants: bool = Query(False, description="按分类筛选时包含子孙分类"),
+    article_status: Optional[str] = Query(None, alias="status", description="文章状态"),
+    tag: Optional[str] = Query(None, description="标签名称"),
+    search: Optional[str] = Query(None, description="搜索关键词"),
+    sort: str = Query("id", description="排序字段，前加-表示倒序"),
+    export_format: str = Query("csv", alias="format", description="导出格式，csv 或 ndjson"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_permission("knowledge:read"))
+) -> StreamingResponse:
+    """
+    导出知识文章（含正文）
+    
+    筛选条件与知识文章列表相同，结果通过服务端游标分批读取并以流的形式返回。
+    
+    Args:
+        category_id: 知识分类ID，用于筛选
+        include_descendants: 是否包含子孙分类下的文章
+        article_status: 文章状态，用于筛选
+        tag: 标签名称，用于筛选
+        search: 搜索关键词
+        sort: 排序字段，搜索时作为相关度之后的次级排序
+        export_format: 导出格式
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        CSV或NDJSON文件的流式响应
+    """
+    query = _filter_articles(
+        select(*KnowledgeArticle.__table__.columns), category_id, include_descendants, article_status, tag, search
+    )
+    query = apply_sort(query, sort, ARTICLE_SORT_COLUMNS, KnowledgeArticle.id)
+    return export_response(db.bind, query, export_format, "knowledge-articles")
 
 
 @router.get("/{article_id}", response_model=KnowledgeArticleSchema)
-def get_knowledge_article(
+async def get_knowledge_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ) -> KnowledgeArticleSchema:
     """
@@ -347,7 +576,7 @@ def get_knowledge_article(
     Raises:
         HTTPException: 如果知识文章不存在
     """
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
     article = result.scalars().first()
     if not article:
         raise HTTPException(
@@ -358,11 +587,11 @@ def get_knowledge_article(
 
 
 @router.put("/{article_id}", response_model=KnowledgeArticleSchema)
-def update_knowledge_article(
+async def update_knowledge_article(
     article_id: int,
     article_in: KnowledgeArticleUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeArticleSchema:
     """
     更新知识文章
@@ -379,7 +608,7 @@ def update_knowledge_article(
     Raises:
         HTTPException: 如果知识文章不存在或知识分类不存在
     """
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
     article = result.scalars().first()
     if not article:
         raise HTTPException(
@@ -389,7 +618,7 @@ def update_knowledge_article(
     
     # 检查知识分类是否存在
     if article_in.category_id:
-        result = db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == article_in.category_id))
+        result = await db.execute(select(KnowledgeCategory).where(KnowledgeCategory.id == article_in.category_id))
         category = result.scalars().first()
         if not category:
             raise HTTPException(
@@ -397,29 +626,14 @@ def update_knowledge_article(
                 detail="Knowledge category not found"
             )
     
-    # 处理标签更新
+    # 处理标签更新，只处理新旧标签的差异
     if article_in.tags is not None:
-        # 减少旧标签使用次数
-        if article.tags:
-            old_tags = [tag.strip() for tag in article.tags.split(",") if tag.strip()]
-            for tag_name in old_tags:
-                result = db.execute(select(KnowledgeTag).where(KnowledgeTag.name == tag_name))
-                tag = result.scalars().first()
-                if tag and tag.usage_count > 0:
-                    tag.usage_count -= 1
-        
-        # 增加新标签使用次数
-        if article_in.tags:
-            new_tags = [tag.strip() for tag in article_in.tags.split(",") if tag.strip()]
-            for tag_name in new_tags:
-                result = db.execute(select(KnowledgeTag).where(KnowledgeTag.name == tag_name))
-                tag = result.scalars().first()
-                if tag:
-                    tag.usage_count += 1
-                else:
-                    # 创建新标签
-                    new_tag = KnowledgeTag(name=tag_name, usage_count=1)
-                    db.add(new_tag)
+        await tag_service.sync_article_tags(
+            db,
+            article.id,
+            tag_service.parse_tags(article.tags),
+            tag_service.parse_tags(article_in.tags)
+        )
     
     # 处理状态更新
     if article_in.status is not None:
@@ -437,17 +651,21 @@ def update_knowledge_article(
     for key, value in update_data.items():
         setattr(article, key, value)
     
-    db.commit()
-    db.refresh(article)
+    # 同步全文索引
+    await search_service.index_article(db, article)
+    
+    await db.commit()
+    await db.refresh(article)
+    invalidate_counts("knowledge_article")
     
     return article
 
 
 @router.put("/{article_id}/publish", response_model=KnowledgeArticleSchema)
-def publish_knowledge_article(
+async def publish_knowledge_article(
     article_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeArticleSchema:
     """
     发布知识文章
@@ -463,7 +681,7 @@ def publish_knowledge_article(
     Raises:
         HTTPException: 如果知识文章不存在
     """
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
     article = result.scalars().first()
     if not article:
         raise HTTPException(
@@ -476,17 +694,18 @@ def publish_knowledge_article(
     if not article.published_at:
         article.published_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    await db.refresh(article)
+    invalidate_counts("knowledge_article")
     
     return article
 
 
 @router.put("/{article_id}/unpublish", response_model=KnowledgeArticleSchema)
-def unpublish_knowledge_article(
+async def unpublish_knowledge_article(
     article_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> KnowledgeArticleSchema:
     """
     下架知识文章
@@ -502,7 +721,7 @@ def unpublish_knowledge_article(
     Raises:
         HTTPException: 如果知识文章不存在
     """
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
     article = result.scalars().first()
     if not article:
         raise HTTPException(
@@ -514,17 +733,18 @@ def unpublish_knowledge_article(
     article.status = "draft"
     article.published_at = None
     
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    await db.refresh(article)
+    invalidate_counts("knowledge_article")
     
     return article
 
 
 @router.delete("/{article_id}")
-def delete_knowledge_article(
+async def delete_knowledge_article(
     article_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("knowledge:write"))
 ) -> dict:
     """
     删除知识文章
@@ -540,7 +760,7 @@ def delete_knowledge_article(
     Raises:
         HTTPException: 如果知识文章不存在
     """
-    result = db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
+    result = await db.execute(select(KnowledgeArticle).where(KnowledgeArticle.id == article_id))
     article = result.scalars().first()
     if not article:
         raise HTTPException(
@@ -548,16 +768,14 @@ def delete_knowledge_article(
             detail="Knowledge article not found"
         )
     
-    # 减少标签使用次数
-    if article.tags:
-        tags = [tag.strip() for tag in article.tags.split(",") if tag.strip()]
-        for tag_name in tags:
-            result = db.execute(select(KnowledgeTag).where(KnowledgeTag.name == tag_name))
-            tag = result.scalars().first()
-            if tag and tag.usage_count > 0:
-                tag.usage_count -= 1
-    
-    db.delete(article)
-    db.commit()
+    # 移除标签关联并减少标签使用次数
+    await tag_service.sync_article_tags(db, article.id, tag_service.parse_tags(article.tags), [])
+    
+    # 从全文索引中移除
+    await search_service.remove_article(db, article_id)
+    
+    await db.delete(article)
+    await db.commit()
+    invalidate_counts("knowledge_article")
     
     return {"message": "Knowledge article deleted successfully"}
@@ -1,21 +1,37 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from app.core.database import get_db
-from app.core.security import get_password_hash
+from app.core.pagination import (
+    apply_sort,
+    cached_count,
+    invalidate_counts,
+    paginate_by_cursor,
+    paginate_by_offset
+)
+from app.core.permissions import invalidate_role_permissions
 from app.models.user import User, Role
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, Role as RoleSchema, RoleCreate, RoleUpdate
-from app.api.deps import get_current_active_user
+from app.schemas.common import Page
+from app.api.deps import get_read_db, require_permission, invalidate_user_cache
+from app.services.password import password_hasher
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
+# 用户列表允许的排序字段
+USER_SORT_COLUMNS = {
+    "id": User.id,
+    "created_at": User.created_at,
+    "username": User.username,
+}
+
 
 @router.post("", response_model=UserSchema)
-def create_user(
+async def create_user(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("user:write"))
 ) -> UserSchema:
     """
     创建新用户
@@ -32,7 +48,7 @@ def create_user(
         HTTPException: 如果用户名或邮箱已存在
     """
     # 检查用户名是否已存在
-    result = db.execute(select(User).where(User.username == user_in.username))
+    result = await db.execute(select(User).where(User.username == user_in.username))
     if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -40,7 +56,7 @@ def create_user(
         )
     
     # 检查邮箱是否已存在
-    result = db.execute(select(User).where(User.email == user_in.email))
+    result = await db.execute(select(User).where(User.email == user_in.email))
     if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -48,7 +64,7 @@ def create_user(
         )
     
     # 创建用户
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await password_hasher.hash_password(user_in.password)
     db_user = User(
         username=user_in.username,
         password=hashed_password,
@@ -58,153 +74,63 @@ def create_user(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    invalidate_counts("user")
     
     return db_user
 
 
-@router.get("", response_model=List[UserSchema])
-def get_users(
+@router.get("", response_model=Union[List[UserSchema], Page[UserSchema]])
+async def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-) -> List[UserSchema]:
+    sort: str = Query("id", description="排序字段，前加-表示倒序"),
+    cursor: Optional[str] = Query(None, description="分页游标，传空值获取第一页并启用游标分页"),
+    envelope: bool = Query(False, description="返回包含总数的分页结果"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_permission("user:read"))
+) -> Union[List[UserSchema], Page[UserSchema]]:
     """
     获取用户列表
     Args:
         skip: 跳过的记录数
         limit: 返回的最大记录数
+        sort: 排序字段
+        cursor: 分页游标，指定时忽略skip并返回分页结果
+        envelope: 是否返回包含total和has_more的分页结果
         db: 数据库会话
         current_user: 当前活跃用户
     
     Returns:
-        用户列表
-    """
-    result = db.execute(select(User).offset(skip).limit(limit))
-    users = result.scalars().all()
-    return users
-
-
-@router.get("/{user_id}", response_model=UserSchema)
-def get_user(
-    user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-) -> UserSchema:
-    """
-    获取单个用户信息
-    
-    Args:
-        user_id: 用户ID
-        db: 数据库会话
-        current_user: 当前活跃用户
-    
-    Returns:
-        用户信息
-    
-    Raises:
-        HTTPException: 如果用户不存在
-    """
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
-
-
-@router.put("/{user_id}", response_model=UserSchema)
-def update_user(
-    user_id: int,
-    user_in: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-) -> UserSchema:
-    """
-    更新用户信息
-    
-    Args:
-        user_id: 用户ID
-        user_in: 更新用户模型
-        db: 数据库会话
-        current_user: 当前活跃用户
-    
-    Returns:
-        更新后的用户信息
-    
-    Raises:
-        HTTPException: 如果用户不存在
-    """
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # 更新用户信息
-    update_data = user_in.dict(exclude_unset=True)
-    
-    # 如果更新密码，需要哈希处理
-    if "password" in update_data:
-        update_data["password"] = get_password_hash(update_data["password"])
-    
-    # 更新用户属性
-    for key, value in update_data.items():
-        setattr(user, key, value)
-    
-    db.commit()
-    db.refresh(user)
-    
-    return user
-
-
-@router.delete("/{user_id}")
-def delete_user(
-    user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-) -> dict:
-    """
-    删除用户
-    
-    Args:
-        user_id: 用户ID
-        db: 数据库会话
-        current_user: 当前活跃用户
-    
-    Returns:
-        删除成功消息
-    
-    Raises:
-        HTTPException: 如果用户不存在
+        用户列表，游标分页或envelope模式下返回分页结果
     """
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    db.delete(user)
-    db.commit()
-    
-    return {"message": "User deleted successfully"}
+    query = select(User)
+    
+    if cursor is not None:
+        # 游标分页
+        result_page = await paginate_by_cursor(db, query, sort, USER_SORT_COLUMNS, User.id, cursor, limit)
+    elif envelope:
+        result_page = await paginate_by_offset(db, apply_sort(query, sort, USER_SORT_COLUMNS, User.id), skip, limit)
+    else:
+        query = apply_sort(query, sort, USER_SORT_COLUMNS, User.id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        users = result.scalars().all()
+        return users
+    
+    # 总数来自缓存的统计结果
+    if envelope:
+        result_page.total = await cached_count(db, "user", query, ())
+    return result_page
 
 
 # 角色管理接口
 
 @router.post("/roles", response_model=RoleSchema)
-def create_role(
+async def create_role(
     role_in: RoleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("role:write"))
 ) -> RoleSchema:
     """
     创建新角色
@@ -221,7 +147,7 @@ def create_role(
         HTTPException: 如果角色名称已存在
     """
     # 检查角色名称是否已存在
-    result = db.execute(select(Role).where(Role.name == role_in.name))
+    result = await db.execute(select(Role).where(Role.name == role_in.name))
     if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -236,16 +162,16 @@ def create_role(
     )
     
     db.add(db_role)
-    db.commit()
-    db.refresh(db_role)
+    await db.commit()
+    await db.refresh(db_role)
     
     return db_role
 
 
 @router.get("/roles", response_model=List[RoleSchema])
-def get_roles(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def get_roles(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_permission("role:read"))
 ) -> List[RoleSchema]:
     """
     获取角色列表
@@ -257,17 +183,17 @@ def get_roles(
     Returns:
         角色列表
     """
-    result = db.execute(select(Role))
+    result = await db.execute(select(Role))
     roles = result.scalars().all()
     return roles
 
 
 @router.put("/roles/{role_id}", response_model=RoleSchema)
-def update_role(
+async def update_role(
     role_id: int,
     role_in: RoleUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("role:write"))
 ) -> RoleSchema:
     """
     更新角色信息
@@ -284,7 +210,7 @@ def update_role(
     Raises:
         HTTPException: 如果角色不存在
     """
-    result = db.execute(select(Role).where(Role.id == role_id))
+    result = await db.execute(select(Role).where(Role.id == role_id))
     role = result.scalars().first()
     if not role:
         raise HTTPException(
@@ -299,17 +225,21 @@ def update_role(
     for key, value in update_data.items():
         setattr(role, key, value)
     
-    db.commit()
-    db.refresh(role)
+    await db.commit()
+    await db.refresh(role)
+    
+    # 角色变更影响该角色下的所有用户
+    invalidate_user_cache()
+    invalidate_role_permissions(role_id)
     
     return role
 
 
 @router.delete("/roles/{role_id}")
-def delete_role(
+async def delete_role(
     role_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("role:write"))
 ) -> dict:
     """
     删除角色
@@ -325,7 +255,7 @@ def delete_role(
     Raises:
         HTTPException: 如果角色不存在
     """
-    result = db.execute(select(Role).where(Role.id == role_id))
+    result = await db.execute(select(Role).where(Role.id == role_id))
     role = result.scalars().first()
     if not role:
         raise HTTPException(
@@ -333,7 +263,129 @@ def delete_role(
             detail="Role not found"
         )
     
-    db.delete(role)
-    db.commit()
+    await db.delete(role)
+    await db.commit()
+    
+    # 角色变更影响该角色下的所有用户
+    invalidate_user_cache()
+    invalidate_role_permissions(role_id)
     
     return {"message": "Role deleted successfully"}
+
+
+@router.get("/{user_id}", response_model=UserSchema)
+async def get_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_permission("user:read"))
+) -> UserSchema:
+    """
+    获取单个用户信息
+    
+    Args:
+        user_id: 用户ID
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        用户信息
+    
+    Raises:
+        HTTPException: 如果用户不存在
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+@router.put("/{user_id}", response_model=UserSchema)
+async def update_user(
+    user_id: int,
+    user_in: UserUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("user:write"))
+) -> UserSchema:
+    """
+    更新用户信息
+    
+    Args:
+        user_id: 用户ID
+        user_in: 更新用户模型
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        更新后的用户信息
+    
+    Raises:
+        HTTPException: 如果用户不存在
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    # 更新用户信息
+    update_data = user_in.dict(exclude_unset=True)
+    
+    # 如果更新密码，需要哈希处理
+    if "password" in update_data:
+        update_data["password"] = await password_hasher.hash_password(update_data["password"])
+    
+    # 修改密码或停用用户时递增令牌版本，使已签发的令牌失效
+    if "password" in update_data or update_data.get("status") is False:
+        user.token_version += 1
+    
+    # 更新用户属性
+    for key, value in update_data.items():
+        setattr(user, key, value)
+    
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user_cache(user_id)
+    
+    return user
+
+
+@router.delete("/{user_id}")
+async def delete_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_permission("user:write"))
+) -> dict:
+    """
+    删除用户
+    
+    Args:
+        user_id: 用户ID
+        db: 数据库会话
+        current_user: 当前活跃用户
+    
+    Returns:
+        删除成功消息
+    
+    Raises:
+        HTTPException: 如果用户不存在
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    await db.delete(user)
+    await db.commit()
+    invalidate_counts("user")
+    invalidate_user_cache(user_id)
+    
+    return {"message": "User deleted successfully"}
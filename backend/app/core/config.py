@@ -12,11 +12,99 @@ class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: str = "sqlite:///app.db"
     
+    # 只读副本连接地址，未配置时读请求使用主库
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # 用户写入后继续从主库读取的时间（秒），应大于复制延迟
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    
+    # 是否打印所有SQL语句，仅用于本地排查
+    DB_ECHO: bool = False
+    
+    # 慢查询日志和语句耗时汇总配置
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    QUERY_STATS_MAX_STATEMENTS: int = 500
+    QUERY_STATS_SAMPLE_SIZE: int = 200
+    # 同一语句在一个请求中执行超过该次数时记录N+1告警
+    N_PLUS_ONE_THRESHOLD: int = 10
+    
+    # 连接池配置，回收时间和预检只对服务器数据库生效
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # SQLite连接参数，每个新连接建立时以PRAGMA设置
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # 后台执行 PRAGMA optimize 和WAL检查点的间隔（秒），0表示不执行
+    SQLITE_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    
     # 安全配置
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # 已撤销令牌的增量同步间隔（秒）
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5.0
+    # 增量同步时重复读取的时间窗口（秒），覆盖提交延迟和服务器间的时钟偏差
+    TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS: float = 60.0
+    
+    # 密码哈希进程池配置
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # 认证用户缓存配置
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    
+    # 角色权限缓存配置
+    PERMISSION_CACHE_TTL_SECONDS: int = 60
+    PERMISSION_CACHE_MAX_ENTRIES: int = 1024
+    
+    # 全文检索配置
+    SEARCH_TOKENIZER: str = "cjk_bigram"
+    SEARCH_WEIGHT_TITLE: float = 10.0
+    SEARCH_WEIGHT_SUMMARY: float = 5.0
+    SEARCH_WEIGHT_TAGS: float = 3.0
+    SEARCH_WEIGHT_CONTENT: float = 1.0
+    
+    # 列表总数缓存配置
+    COUNT_CACHE_TTL_SECONDS: int = 10
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    
+    # 分类树缓存检查版本号的间隔（秒）
+    CATEGORY_TREE_CHECK_SECONDS: float = 5.0
+    
+    # 档案批量导入配置：每个事务插入的行数，错误报告最多返回的行数
+    BULK_IMPORT_CHUNK_SIZE: int = 1000
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+    # 档案批量更新和删除时ID列表的最大长度
+    BULK_MAX_IDS: int = 10000
+    
+    # 导出时服务端游标每批读取的行数
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # 档案文件存储目录，file_path 为相对于该目录的路径
+    UPLOAD_DIR: str = "uploads"
+    # 单个文件的最大大小（字节）
+    UPLOAD_MAX_SIZE: int = 2 * 1024 * 1024 * 1024
+    # 读写上传文件时每块的大小（字节）
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # 未完成的断点续传会话保留的时间（秒）
+    UPLOAD_SESSION_TTL_SECONDS: int = 86400
+    # 断点续传写入租约的时长（秒），写入期间每过一半时长续期一次，进程异常退出后租约到期即可重新上传
+    UPLOAD_LEASE_SECONDS: int = 60
+    
+    # 内容寻址存储的垃圾回收间隔（秒），0表示不执行
+    BLOB_GC_INTERVAL_SECONDS: int = 3600
+    # 引用计数归零或未登记的文件保留的时间（秒），超过后才会被回收
+    BLOB_GC_GRACE_SECONDS: int = 3600
+    
     # CORS配置
     BACKEND_CORS_ORIGINS: list = ["*"]
     
@@ -1,33 +1,234 @@
+from typing import Tuple, Union
 from sqlmodel import SQLModel
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.query_log import install_query_log
+from app.core.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.core.sqlite import install_pragmas, sqlite_pragmas
+
+# 各数据库默认使用的同步和异步驱动
+SYNC_DRIVERS = {"sqlite": "sqlite", "postgresql": "postgresql+psycopg2", "mysql": "mysql+pymysql"}
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+
+def sync_url(url: str) -> URL:
+    """
+    将数据库连接地址转换为同步驱动的地址，已指定同步驱动时保持不变
+    
+    Args:
+        url: 数据库连接地址
+    
+    Returns:
+        同步驱动的连接地址
+    """
+    url = make_url(url)
+    if "+" in url.drivername and url.drivername not in ASYNC_DRIVERS.values():
+        return url
+    backend = url.get_backend_name()
+    return url.set(drivername=SYNC_DRIVERS.get(backend, backend))
 
-# 创建同步引擎
-engine = create_engine(
-    "sqlite:///app.db",
-    echo=settings.DEBUG,
-    future=True
-)
 
-# 创建会话工厂
+def async_url(url: str) -> URL:
+    """
+    将数据库连接地址转换为异步驱动的地址，已指定异步驱动时保持不变
+    
+    Args:
+        url: 数据库连接地址
+    
+    Returns:
+        异步驱动的连接地址
+    """
+    url = make_url(url)
+    if url.drivername in ASYNC_DRIVERS.values():
+        return url
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def engine_options(url: URL, poolclass) -> dict:
+    """
+    按数据库方言生成引擎参数
+    
+    Args:
+        url: 数据库连接地址
+        poolclass: 连接池类
+    
+    Returns:
+        create_engine 的关键字参数
+    """
+    options = {"echo": settings.DB_ECHO}
+    backend = url.get_backend_name()
+    
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # 内存数据库的每个连接都是独立的库，保留SQLAlchemy默认的连接池
+        return options
+    
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    
+    if backend == "sqlite":
+        # 本地文件没有连接断开的问题，不需要预检和定期重建连接
+        if url.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+    
+    options.update(
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # 优先复用最近归还的连接，使空闲连接能被服务端及时回收
+        pool_use_lifo=True,
+    )
+    
+    if backend == "postgresql":
+        # 接口查询都是短查询，关闭JIT避免编译开销
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"jit": "off"}}
+        else:
+            options["connect_args"] = {"options": "-c jit=off"}
+    return options
+
+
+def create_engines(url: str, name: str) -> Tuple[Engine, AsyncEngine]:
+    """
+    根据连接地址创建同步和异步引擎
+    
+    Args:
+        url: 数据库连接地址
+        name: 引擎名称，用于区分连接池统计
+    
+    Returns:
+        (同步引擎, 异步引擎)
+    """
+    sync_engine_url = sync_url(url)
+    async_engine_url = async_url(url)
+    sync_engine = create_engine(sync_engine_url, **engine_options(sync_engine_url, TimedQueuePool))
+    async_engine = create_async_engine(async_engine_url, **engine_options(async_engine_url, TimedAsyncAdaptedQueuePool))
+    
+    for target, kind in ((sync_engine, "sync"), (async_engine.sync_engine, "async")):
+        target.pool.stats_name = f"{name}.{kind}"
+        # 为每个新连接设置SQLite参数
+        install_pragmas(target, sqlite_pragmas())
+        # 语句计时和慢查询日志
+        install_query_log(target)
+    
+    return sync_engine, async_engine
+
+
+# 同步引擎用于启动时建表、迁移等非请求路径，请求处理使用异步引擎
+engine, async_engine = create_engines(settings.DATABASE_URL, "primary")
+
+# 创建同步会话工厂
 SessionLocal = sessionmaker(
     engine,
     expire_on_commit=False
 )
 
-def get_db():
+class PrimarySession(Session):
+    """主库会话，提交包含写入的事务后记录写入的用户，用于读己之写"""
+
+
+# 创建异步会话工厂
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    expire_on_commit=False,
+    sync_session_class=PrimarySession
+)
+
+# 只读副本引擎，未配置时读请求也使用主库
+replica_engine, replica_async_engine = (
+    create_engines(settings.DATABASE_REPLICA_URL, "replica")
+    if settings.DATABASE_REPLICA_URL else (None, None)
+)
+
+# 创建只读会话工厂
+ReadSessionLocal = async_sessionmaker(
+    replica_async_engine, expire_on_commit=False
+) if replica_async_engine is not None else None
+
+# 最近有写入的用户，在复制延迟窗口内其读请求仍走主库
+_recent_writers = TTLCache(maxsize=settings.USER_CACHE_MAX_ENTRIES, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    # 直接执行的 UPDATE/DELETE/INSERT 语句不经过flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_writer(session):
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        _recent_writers.set(user_id, True)
+
+
+def recently_wrote(user_id: int) -> bool:
     """
-    获取数据库会话
+    用户是否在读己之写窗口内提交过写入
+    
+    Args:
+        user_id: 用户ID
+    
+    Returns:
+        是否需要从主库读取
+    """
+    return _recent_writers.get(user_id, False)
+
+
+async def get_db():
+    """
+    获取异步数据库会话
     
     Yields:
-        数据库会话实例
+        异步数据库会话实例
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_replica_db():
+    """
+    获取只读副本会话，未配置只读副本时返回None
+    
+    Yields:
+        只读副本会话实例或None
+    """
+    if ReadSessionLocal is None:
+        yield None
+        return
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def upsert_insert(db: Union[Session, AsyncSession], model):
+    """
+    按数据库方言构造支持 ON CONFLICT 的 insert 语句
+    
+    Args:
+        db: 数据库会话
+        model: 模型类
+    
+    Returns:
+        insert 语句
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
 
 
 def init_db():
@@ -37,6 +238,14 @@ def init_db():
     # 创建所有表
     SQLModel.metadata.create_all(engine)
     
+    # 执行数据迁移
+    from app.core.migrations import run_migrations
+    run_migrations(engine)
+    
+    # 创建知识文章全文索引
+    from app.services.search import init_search_index
+    init_search_index(engine)
+    
     # 添加默认角色和用户
     from app.models.user import User, Role
     from app.core.security import get_password_hash
@@ -50,7 +259,7 @@ def init_db():
             admin_role = db.query(Role).filter(Role.name == "admin").first()
             if not admin_role:
                 # 创建admin角色
-                admin_role = Role(name="admin", description="管理员")
+                admin_role = Role(name="admin", description="管理员", permissions="*")
                 db.add(admin_role)
                 db.commit()
                 db.refresh(admin_role)
@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# 迁移记录表使用独立的元数据，不参与业务模型的 create_all
+_metadata = MetaData()
+
+schema_migration = Table(
+    "schema_migration",
+    _metadata,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+# 按顺序执行的迁移列表，名称一经发布不可修改
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = []
+
+
+def migration(name: str):
+    """
+    注册数据迁移
+
+    新表由 create_all 创建，迁移只负责回填数据和变更已有表。
+
+    Args:
+        name: 迁移名称，用于记录是否已执行
+    """
+    def decorator(func: Callable[[Connection], None]):
+        MIGRATIONS.append((name, func))
+        return func
+    return decorator
+
+
+def ensure_indexes(engine: Engine) -> None:
+    """
+    为已有表补建模型中新增的索引（create_all 只为新表创建索引）
+
+    Args:
+        engine: 数据库引擎
+    """
+    from sqlmodel import SQLModel
+
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def add_column(conn: Connection, table_name: str, column_name: str, column_type: str) -> None:
+    """
+    为已有表添加列，列已存在时跳过（新库由 create_all 直接建出该列）
+
+    Args:
+        conn: 数据库连接
+        table_name: 表名
+        column_name: 列名
+        column_type: 列类型的SQL表示
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    if column_name not in columns:
+        quote = conn.dialect.identifier_preparer.quote
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(column_name)} {column_type}"))
+
+
+def run_migrations(engine: Engine) -> None:
+    """
+    执行尚未执行的迁移并补建索引，每个迁移在独立事务中完成
+
+    Args:
+        engine: 数据库引擎
+    """
+    _metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migration.c.name)).scalars())
+
+    for name, func in MIGRATIONS:
+        if name in applied:
+            continue
+        with engine.begin() as conn:
+            func(conn)
+            conn.execute(insert(schema_migration).values(name=name, applied_at=datetime.utcnow()))
+        print(f"Migration applied: {name}")
+
+    ensure_indexes(engine)
+
+
+@migration("0001_backfill_article_tags")
+def backfill_article_tags(conn: Connection) -> None:
+    """从文章的逗号分隔标签回填文章标签关联表"""
+    from app.models.knowledge import ArticleTag, KnowledgeArticle, KnowledgeTag
+    from app.services.tags import parse_tags
+
+    rows = conn.execute(
+        select(KnowledgeArticle.id, KnowledgeArticle.tags).where(KnowledgeArticle.tags.is_not(None))
+    ).all()
+    article_tags = [(article_id, parse_tags(tags)) for article_id, tags in rows]
+
+    names = {name for _, tags in article_tags for name in tags}
+    if not names:
+        return
+
+    # 补齐标签表中缺失的标签
+    existing = dict(conn.execute(select(KnowledgeTag.name, KnowledgeTag.id)).all())
+    missing = names - existing.keys()
+    if missing:
+        now = datetime.utcnow()
+        conn.execute(
+            insert(KnowledgeTag.__table__),
+            [{"name": name, "usage_count": 0, "created_at": now} for name in missing]
+        )
+        existing = dict(conn.execute(select(KnowledgeTag.name, KnowledgeTag.id)).all())
+
+    conn.execute(
+        insert(ArticleTag.__table__),
+        [
+            {"article_id": article_id, "tag_id": existing[name]}
+            for article_id, tags in article_tags
+            for name in tags
+        ]
+    )
+
+
+@migration("0002_category_materialized_path")
+def backfill_category_paths(conn: Connection) -> None:
+    """为档案分类和知识分类添加物化路径列，并用递归查询回填"""
+    for table_name in ("archivecategory", "knowledgecategory"):
+        add_column(conn, table_name, "path", "VARCHAR")
+        conn.execute(text(f"""
+            WITH RECURSIVE tree(id, path) AS (
+                SELECT id, '/' || CAST(id AS TEXT) || '/' FROM {table_name} WHERE parent_id IS NULL
+                UNION ALL
+                SELECT child.id, tree.path || CAST(child.id AS TEXT) || '/'
+                FROM {table_name} AS child JOIN tree ON child.parent_id = tree.id
+            )
+            UPDATE {table_name} SET path = (SELECT tree.path FROM tree WHERE tree.id = {table_name}.id)
+        """))
+
+
+@migration("0003_user_token_version")
+def add_user_token_version(conn: Connection) -> None:
+    """为用户表添加令牌版本列"""
+    add_column(conn, "user", "token_version", "INTEGER NOT NULL DEFAULT 0")
+
+
+@migration("0004_admin_role_permissions")
+def grant_admin_permissions(conn: Connection) -> None:
+    """为未配置权限的管理员角色授予全部权限"""
+    conn.execute(text("UPDATE role SET permissions = '*' WHERE name = 'admin' AND permissions IS NULL"))
+
+
+@migration("0005_archive_file_columns")
+def add_archive_file_columns(conn: Connection) -> None:
+    """为档案表添加上传文件的文件名和大小列"""
+    add_column(conn, "archive", "file_name", "VARCHAR")
+    add_column(conn, "archive", "file_size", "INTEGER")
+
+
+@migration("0006_archive_file_hash")
+def add_archive_file_hash(conn: Connection) -> None:
+    """为档案表添加文件内容哈希列，此前上传的文件不计入内容寻址存储"""
+    add_column(conn, "archive", "file_hash", "VARCHAR")
+
+
+@migration("0007_archive_upload_lease")
+def add_archive_upload_lease(conn: Connection) -> None:
+    """为断点续传会话添加写入租约列，多进程部署时由数据库保证同一会话同时只有一个请求写入"""
+    add_column(conn, "archiveupload", "locked_until", "TIMESTAMP")
@@ -0,0 +1,212 @@
+import base64
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.common import Page
+
+# 列表总数缓存，键为(数据集名称, 数据集版本, 筛选条件)
+_count_cache = TTLCache(maxsize=settings.COUNT_CACHE_MAX_ENTRIES, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+# 数据集版本，写入后递增使该数据集的总数缓存全部失效
+_count_versions: Dict[str, int] = defaultdict(int)
+_count_versions_lock = threading.Lock()
+
+
+def parse_sort(sort: str, columns: Dict[str, Any]) -> Tuple[str, Any, bool]:
+    """
+    解析排序参数，字段名前加"-"表示倒序
+
+    Args:
+        sort: 排序参数，如 "created_at" 或 "-created_at"
+        columns: 允许排序的字段名到列的映射
+
+    Returns:
+        (字段名, 列, 是否倒序)
+
+    Raises:
+        HTTPException: 如果排序字段不受支持
+    """
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort field: {name}"
+        )
+    return name, columns[name], descending
+
+
+def apply_sort(query, sort: str, columns: Dict[str, Any], id_column):
+    """
+    按排序字段和ID排序，ID作为次级排序键保证顺序稳定
+
+    Args:
+        query: 查询
+        sort: 排序参数
+        columns: 允许排序的字段名到列的映射
+        id_column: 主键列
+
+    Returns:
+        附加排序后的查询
+    """
+    _, column, descending = parse_sort(sort, columns)
+    keys = [column] if column is id_column else [column, id_column]
+    return query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """
+    将排序参数和最后一条记录的排序键编码为不透明游标
+
+    Args:
+        sort: 排序参数
+        value: 最后一条记录的排序字段值
+        last_id: 最后一条记录的ID
+
+    Returns:
+        游标字符串
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column) -> Tuple[Any, int]:
+    """
+    解码游标
+
+    Args:
+        cursor: 游标字符串
+        sort: 当前请求的排序参数
+        column: 排序列
+
+    Returns:
+        (排序字段值, ID)
+
+    Raises:
+        HTTPException: 如果游标无效或与排序参数不一致
+    """
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+    if cursor_sort != sort:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match sort order"
+        )
+    return value, last_id
+
+
+async def paginate_by_cursor(
+    db: AsyncSession,
+    query,
+    sort: str,
+    columns: Dict[str, Any],
+    id_column,
+    cursor: str,
+    limit: int
+) -> Page:
+    """
+    基于(排序字段, ID)的游标分页，通过索引范围查找定位下一页，不使用OFFSET
+
+    Args:
+        db: 数据库会话
+        query: 已附加筛选条件的查询
+        sort: 排序参数
+        columns: 允许排序的字段名到列的映射
+        id_column: 主键列
+        cursor: 上一页返回的游标，空字符串表示第一页
+        limit: 每页记录数
+
+    Returns:
+        分页结果
+    """
+    name, column, descending = parse_sort(sort, columns)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, column)
+        if column is id_column:
+            key, bound = id_column, last_id
+        else:
+            key, bound = tuple_(column, id_column), tuple_(value, last_id)
+        query = query.where(key < bound if descending else key > bound)
+
+    query = apply_sort(query, sort, columns, id_column)
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, getattr(last, name), last.id)
+
+    return Page(items=items, has_more=has_more, next_cursor=next_cursor)
+
+
+async def paginate_by_offset(db: AsyncSession, query, skip: int, limit: int) -> Page:
+    """
+    基于OFFSET的分页，多取一条记录判断是否还有下一页
+
+    Args:
+        db: 数据库会话
+        query: 已附加筛选条件和排序的查询
+        skip: 跳过的记录数
+        limit: 每页记录数
+
+    Returns:
+        分页结果
+    """
+    rows = (await db.execute(query.offset(skip).limit(limit + 1))).scalars().all()
+    return Page(items=rows[:limit], has_more=len(rows) > limit)
+
+
+async def cached_count(db: AsyncSession, dataset: str, query, filters: Tuple[Hashable, ...]) -> int:
+    """
+    获取查询结果总数，相同筛选条件在缓存有效期内只统计一次
+
+    Args:
+        db: 数据库会话
+        dataset: 数据集名称，如 "archive"
+        query: 已附加筛选条件的查询
+        filters: 筛选条件取值，作为缓存键的一部分
+
+    Returns:
+        记录总数
+    """
+    key = (dataset, _count_versions[dataset], filters)
+    total = _count_cache.get(key)
+    if total is None:
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        total = (await db.execute(count_query)).scalar_one()
+        _count_cache.set(key, total)
+    return total
+
+
+def invalidate_counts(dataset: str) -> None:
+    """
+    使数据集的总数缓存失效，在数据集写入后调用
+
+    Args:
+        dataset: 数据集名称
+    """
+    with _count_versions_lock:
+        _count_versions[dataset] += 1
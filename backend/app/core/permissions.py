@@ -0,0 +1,112 @@
+import re
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# 权限名称列表，每个权限对应位掩码中的一位，新权限只能追加到末尾
+PERMISSIONS = [
+    "user:read",
+    "user:write",
+    "role:read",
+    "role:write",
+    "archive:read",
+    "archive:write",
+    "knowledge:read",
+    "knowledge:write",
+    "system:read",
+]
+
+PERMISSION_BITS: Dict[str, int] = {name: 1 << index for index, name in enumerate(PERMISSIONS)}
+
+# 全部权限
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+# 角色权限掩码缓存，键为角色ID；其他进程的角色变更在存活时间后生效
+_role_masks = TTLCache(maxsize=settings.PERMISSION_CACHE_MAX_ENTRIES, ttl=settings.PERMISSION_CACHE_TTL_SECONDS)
+
+
+def permission_bit(name: str) -> int:
+    """
+    获取权限对应的位
+
+    Args:
+        name: 权限名称，如 "archive:write"
+
+    Returns:
+        权限位
+
+    Raises:
+        ValueError: 如果权限名称未注册
+    """
+    try:
+        return PERMISSION_BITS[name]
+    except KeyError:
+        raise ValueError(f"Unknown permission: {name}")
+
+
+def parse_permissions(permissions: Optional[str]) -> int:
+    """
+    将角色的权限字符串解析为位掩码
+
+    权限之间以逗号或空白分隔，"*" 表示全部权限，"archive:*" 表示该资源的全部权限，
+    未注册的权限名称被忽略。
+
+    Args:
+        permissions: 权限字符串，如 "archive:read,archive:write"
+
+    Returns:
+        权限位掩码
+    """
+    mask = 0
+    for name in re.split(r"[,\s]+", permissions or ""):
+        if not name:
+            continue
+        if name == "*":
+            return ALL_PERMISSIONS
+        if name.endswith(":*"):
+            prefix = name[:-1]
+            for permission, bit in PERMISSION_BITS.items():
+                if permission.startswith(prefix):
+                    mask |= bit
+        else:
+            mask |= PERMISSION_BITS.get(name, 0)
+    return mask
+
+
+async def get_role_mask(db: AsyncSession, role_id: Optional[int]) -> int:
+    """
+    获取角色的权限位掩码，命中缓存时不访问数据库
+
+    Args:
+        db: 数据库会话
+        role_id: 角色ID
+
+    Returns:
+        权限位掩码，没有角色时为0
+    """
+    if role_id is None:
+        return 0
+
+    mask = _role_masks.get(role_id)
+    if mask is None:
+        from app.models.user import Role
+
+        permissions = (await db.execute(select(Role.permissions).where(Role.id == role_id))).scalar()
+        mask = parse_permissions(permissions)
+        _role_masks.set(role_id, mask)
+    return mask
+
+
+def invalidate_role_permissions(role_id: Optional[int] = None) -> None:
+    """
+    使角色权限缓存失效，在角色变更后调用
+
+    Args:
+        role_id: 角色ID，为None时清空全部缓存
+    """
+    if role_id is None:
+        _role_masks.clear()
+    else:
+        _role_masks.pop(role_id)
@@ -0,0 +1,123 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 等待时间分布的上界（毫秒），最后一档为超过最大上界的等待
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolWaitStats:
+    """
+    连接池取连接的等待时间统计，用于评估连接池大小是否合适
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        """
+        记录一次取连接
+
+        Args:
+            wait: 等待时间（秒）
+            timed_out: 是否等待超时
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.buckets[bisect_left(WAIT_BUCKETS_MS, wait * 1000)] += 1
+
+    def snapshot(self) -> dict:
+        """
+        获取统计结果
+
+        Returns:
+            取连接次数、超时次数、平均和最大等待时间及等待时间分布
+        """
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "wait_histogram": dict(zip(labels, self.buckets)),
+            }
+
+
+# 各连接池的等待统计，键为引擎名称
+pool_stats: Dict[str, PoolWaitStats] = {}
+
+
+class _TimedPoolMixin:
+    """记录取连接等待时间的连接池，通过 stats_name 关联到 pool_stats 中的统计"""
+
+    stats_name = "default"
+
+    def _do_get(self):
+        stats = pool_stats.setdefault(self.stats_name, PoolWaitStats())
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats_name = self.stats_name
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """记录等待时间的同步连接池"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """记录等待时间的异步连接池"""
+
+
+def pool_status(engine) -> dict:
+    """
+    获取引擎连接池的当前状态和等待统计
+
+    Args:
+        engine: 同步引擎
+
+    Returns:
+        连接池状态
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    stats = pool_stats.get(getattr(pool, "stats_name", None))
+    if stats is not None:
+        status["wait"] = stats.snapshot()
+    return status
@@ -0,0 +1,303 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.slow_query")
+n_plus_one_logger = logging.getLogger("app.db.n_plus_one")
+
+# 当前请求的ASGI scope，路由匹配后可从中取得路由模板
+current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+# 已安装计时钩子的引擎
+_engines: List[Engine] = []
+
+
+class RequestQueries:
+    """单个请求内执行的语句数、数据库耗时和各归一化语句的执行次数"""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """
+        获取执行次数超过阈值的语句
+
+        Args:
+            threshold: 次数阈值
+
+        Returns:
+            (语句, 次数) 列表，按次数倒序
+        """
+        return [(sql, count) for sql, count in self.statements.most_common() if count > threshold]
+
+
+# 当前请求的语句统计
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|(?<!:):\w+|%s")
+_LIST = re.compile(r"\bIN \(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_ROWS = re.compile(r"(\(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    """
+    归一化SQL语句，将字面量和占位符替换为 ?，并合并长度不同的IN列表和多行VALUES
+
+    Args:
+        statement: SQL语句
+
+    Returns:
+        归一化后的SQL语句
+    """
+    sql = _SPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("IN (?, ...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return sql
+
+
+def current_route() -> Optional[str]:
+    """
+    获取当前请求的路由，如 "GET /api/archive/{archive_id}"
+
+    Returns:
+        路由，不在请求中执行时为None
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class QueryStats:
+    """
+    按归一化语句汇总执行次数和耗时，每条语句保留最近的耗时样本用于计算P95
+    """
+
+    def __init__(self, max_statements: int, sample_size: int):
+        """
+        Args:
+            max_statements: 最多统计的语句数，超过后新语句不再统计
+            sample_size: 每条语句保留的耗时样本数
+        """
+        self.max_statements = max_statements
+        self.sample_size = sample_size
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed: float) -> None:
+        """
+        记录一次执行
+
+        Args:
+            sql: 归一化后的语句
+            elapsed: 耗时（秒）
+        """
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None:
+                if len(self._stats) >= self.max_statements:
+                    return
+                stats = self._stats[sql] = {"count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=self.sample_size)}
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+            stats["samples"].append(elapsed)
+
+    def snapshot(self, sort: str = "total", limit: int = 50) -> List[dict]:
+        """
+        获取汇总结果
+
+        Args:
+            sort: 排序字段，count、total、p95 或 max
+            limit: 返回的语句数
+
+        Returns:
+            按排序字段倒序的语句汇总
+        """
+        with self._lock:
+            items = [(sql, dict(stats, samples=list(stats["samples"]))) for sql, stats in self._stats.items()]
+
+        rows = []
+        for sql, stats in items:
+            samples: List[float] = sorted(stats["samples"])
+            p95 = samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)] if samples else 0.0
+            rows.append({
+                "sql": sql,
+                "count": stats["count"],
+                "total_ms": round(stats["total"] * 1000, 3),
+                "avg_ms": round(stats["total"] / stats["count"] * 1000, 3),
+                "p95_ms": round(p95 * 1000, 3),
+                "max_ms": round(stats["max"] * 1000, 3),
+            })
+        rows.sort(key=lambda row: row[f"{sort}_ms" if sort != "count" else "count"], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        """清空汇总"""
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats(settings.QUERY_STATS_MAX_STATEMENTS, settings.QUERY_STATS_SAMPLE_SIZE)
+
+
+def _param_count(parameters, executemany: bool) -> int:
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    return len(parameters) if parameters else 0
+
+
+def install_query_log(engine: Engine) -> None:
+    """
+    为引擎安装语句计时钩子：汇总每条语句的耗时，并以JSON记录超过阈值的慢查询
+
+    Args:
+        engine: 同步引擎，异步引擎传入其 sync_engine
+    """
+
+    _engines.append(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        sql = normalize_sql(statement)
+        query_stats.record(sql, elapsed)
+
+        queries = current_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.duration += elapsed
+            # 分批的 executemany 本身就是批量写入，不计入N+1检测
+            if not executemany:
+                queries.statements[sql] += 1
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            rowcount = cursor.rowcount
+            logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 3),
+                "sql": sql,
+                "params": _param_count(parameters, executemany),
+                "batch": len(parameters) if executemany else 1,
+                "rows": rowcount if rowcount is not None and rowcount >= 0 else None,
+                "route": current_route(),
+            }, ensure_ascii=False))
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # 执行失败时不会触发 after_cursor_execute，丢弃对应的开始时间
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+class QueryContextMiddleware:
+    """
+    纯ASGI中间件，统计每个请求执行的语句
+
+    请求处理期间保存当前请求的scope和语句统计，供语句钩子读取路由并累加计数。
+    调试模式下在响应头中返回语句数和数据库耗时；同一语句在一个请求中执行次数超过
+    N_PLUS_ONE_THRESHOLD 时记录N+1告警。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        scope_token = current_scope.set(scope)
+        queries_token = current_queries.set(queries)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(queries.count).encode()))
+                headers.append((b"x-db-time-ms", f"{queries.duration * 1000:.3f}".encode()))
+                repeated = queries.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    headers.append((b"x-db-repeated-query-count", str(repeated[0][1]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            for sql, count in queries.repeated(settings.N_PLUS_ONE_THRESHOLD):
+                n_plus_one_logger.warning(json.dumps({
+                    "event": "n_plus_one",
+                    "route": current_route(),
+                    "sql": sql,
+                    "count": count,
+                    "total_queries": queries.count,
+                }, ensure_ascii=False))
+            current_queries.reset(queries_token)
+            current_scope.reset(scope_token)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    断言代码块内执行的语句数不超过预算，用于在测试中防止接口出现N+1回归
+
+    统计所有已安装计时钩子的引擎，因此也能统计 TestClient 在其他线程中处理的请求。
+
+    用法：
+        with assert_max_queries(5):
+            client.get("/api/archive")
+
+    Args:
+        limit: 允许执行的最大语句数
+
+    Yields:
+        已执行的语句列表
+
+    Raises:
+        AssertionError: 如果语句数超过预算
+    """
+    statements: List[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for engine in _engines:
+        event.listen(engine, "after_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        for engine in _engines:
+            event.remove(engine, "after_cursor_execute", count)
+
+    if len(statements) > limit:
+        listing = "\n".join(f"  {normalize_sql(statement)}" for statement in statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {len(statements)}:\n{listing}")
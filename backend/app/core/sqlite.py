@@ -0,0 +1,68 @@
+import asyncio
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+
+
+def sqlite_pragmas() -> List[str]:
+    """
+    根据配置生成每个新连接需要执行的PRAGMA语句
+
+    Returns:
+        PRAGMA语句列表
+    """
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        # 负数表示以KiB为单位
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    ]
+
+
+def install_pragmas(engine: Engine, pragmas: List[str]) -> None:
+    """
+    在引擎每次建立新连接时执行PRAGMA语句，非SQLite引擎不做处理
+
+    Args:
+        engine: 同步引擎，异步引擎传入其 sync_engine
+        pragmas: PRAGMA语句列表
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+async def run_maintenance(engine: AsyncEngine) -> None:
+    """
+    定期更新查询规划器统计信息并将WAL检查点写回主库文件，直到任务被取消
+
+    长时间运行的进程不会触发连接关闭时的 PRAGMA optimize，WAL文件在持续读取时也可能
+    无法自动截断，因此由后台任务每 SQLITE_MAINTENANCE_INTERVAL_SECONDS 秒执行一次。
+
+    Args:
+        engine: 异步引擎
+    """
+    if engine.dialect.name != "sqlite" or settings.SQLITE_MAINTENANCE_INTERVAL_SECONDS <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(settings.SQLITE_MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA optimize")
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            print(f"SQLite maintenance failed: {e}")
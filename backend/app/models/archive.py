@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List
 from datetime import datetime
 
@@ -8,7 +9,8 @@ class ArchiveCategory(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(..., index=True, description="分类名称")
     description: Optional[str] = Field(default=None, description="分类描述")
-    parent_id: Optional[int] = Field(default=None, foreign_key="archivecategory.id", description="父分类ID")
+    parent_id: Optional[int] = Field(default=None, foreign_key="archivecategory.id", index=True, description="父分类ID")
+    path: Optional[str] = Field(default=None, index=True, description="物化路径，如 /1/5/9/")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
     
@@ -20,10 +22,21 @@ class ArchiveCategory(SQLModel, table=True):
 
 class Archive(SQLModel, table=True):
     """档案模型"""
+    __table_args__ = (
+        # 游标分页使用的(排序字段, ID)索引
+        Index("ix_archive_created_at_id", "created_at", "id"),
+        Index("ix_archive_updated_at_id", "updated_at", "id"),
+        # 按分类筛选并按ID排序
+        Index("ix_archive_category_id_id", "category_id", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(..., index=True, description="档案标题")
     description: Optional[str] = Field(default=None, description="档案描述")
     file_path: Optional[str] = Field(default=None, description="文件路径")
+    file_name: Optional[str] = Field(default=None, description="上传时的原始文件名")
+    file_size: Optional[int] = Field(default=None, description="文件大小（字节）")
+    file_hash: Optional[str] = Field(default=None, index=True, description="文件内容的SHA-256，对应 file_blob 表")
     category_id: Optional[int] = Field(default=None, foreign_key="archivecategory.id", description="分类ID")
     archive_type: str = Field(default="document", description="档案类型")
     created_by: Optional[int] = Field(default=None, description="创建者ID")
@@ -32,3 +45,14 @@ class Archive(SQLModel, table=True):
     
     # 关系
     category: Optional[ArchiveCategory] = Relationship(back_populates="archives")
+
+
+class ArchiveUpload(SQLModel, table=True):
+    """档案文件断点续传会话，已上传的字节数即临时文件的大小"""
+    id: str = Field(primary_key=True, description="上传ID")
+    archive_id: int = Field(..., foreign_key="archive.id", index=True, description="档案ID")
+    file_name: str = Field(..., description="原始文件名")
+    file_size: int = Field(..., description="文件总大小（字节）")
+    created_by: Optional[int] = Field(default=None, description="创建者ID")
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True, description="创建时间")
+    locked_until: Optional[datetime] = Field(default=None, description="写入租约的到期时间，为空或已过期时可被请求占用")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,7 +17,8 @@ class KnowledgeCategory(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(..., index=True, description="分类名称")
     description: Optional[str] = Field(default=None, description="分类描述")
-    parent_id: Optional[int] = Field(default=None, foreign_key="knowledgecategory.id", description="父分类ID")
+    parent_id: Optional[int] = Field(default=None, foreign_key="knowledgecategory.id", index=True, description="父分类ID")
+    path: Optional[str] = Field(default=None, index=True, description="物化路径，如 /1/5/9/")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
     
@@ -28,6 +30,15 @@ class KnowledgeCategory(SQLModel, table=True):
 
 class KnowledgeArticle(SQLModel, table=True):
     """知识文章模型"""
+    __table_args__ = (
+        # 游标分页使用的(排序字段, ID)索引
+        Index("ix_knowledgearticle_created_at_id", "created_at", "id"),
+        Index("ix_knowledgearticle_updated_at_id", "updated_at", "id"),
+        # 按状态（及分类）筛选，按分类筛选
+        Index("ix_knowledgearticle_status_category_id_id", "status", "category_id", "id"),
+        Index("ix_knowledgearticle_category_id_id", "category_id", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(..., index=True, description="文章标题")
     content: str = Field(..., description="文章内容")
@@ -42,3 +53,15 @@ class KnowledgeArticle(SQLModel, table=True):
     
     # 关系
     category: Optional[KnowledgeCategory] = Relationship(back_populates="articles")
+
+
+class ArticleTag(SQLModel, table=True):
+    """文章标签关联模型"""
+    __tablename__ = "article_tag"
+    __table_args__ = (
+        # 按标签筛选文章时使用的覆盖索引
+        Index("ix_article_tag_tag_id_article_id", "tag_id", "article_id"),
+    )
+
+    article_id: int = Field(foreign_key="knowledgearticle.id", primary_key=True, description="文章ID")
+    tag_id: int = Field(foreign_key="knowledgetag.id", primary_key=True, description="标签ID")
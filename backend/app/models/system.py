@@ -0,0 +1,23 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class CacheVersion(SQLModel, table=True):
+    """缓存版本模型，进程内缓存通过比较版本号感知其他进程的写入"""
+    __tablename__ = "cache_version"
+
+    name: str = Field(..., primary_key=True, description="缓存名称")
+    version: int = Field(default=0, description="版本号")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
+
+
+class FileBlob(SQLModel, table=True):
+    """内容寻址存储中的文件，相同内容只保存一份，引用计数为引用该文件的档案数"""
+    __tablename__ = "file_blob"
+
+    hash: str = Field(..., primary_key=True, description="文件内容的SHA-256")
+    size: int = Field(..., description="文件大小（字节）")
+    ref_count: int = Field(default=0, index=True, description="引用计数")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
+    released_at: Optional[datetime] = Field(default=None, description="最近一次减少引用的时间")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List
 from datetime import datetime
 
@@ -17,15 +18,32 @@ class Role(SQLModel, table=True):
 
 class User(SQLModel, table=True):
     """用户模型"""
+    __table_args__ = (
+        # 游标分页使用的(排序字段, ID)索引
+        Index("ix_user_created_at_id", "created_at", "id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(..., index=True, unique=True, description="用户名")
     password: str = Field(..., description="密码哈希")
     name: str = Field(..., description="姓名")
     email: str = Field(..., index=True, unique=True, description="邮箱")
-    role_id: Optional[int] = Field(default=None, foreign_key="role.id", description="角色ID")
+    role_id: Optional[int] = Field(default=None, foreign_key="role.id", index=True, description="角色ID")
     status: bool = Field(default=True, description="状态")
+    token_version: int = Field(default=0, description="令牌版本，递增后已签发的令牌全部失效")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
     
     # 关系
     role: Optional[Role] = Relationship(back_populates="users")
+
+
+class RevokedToken(SQLModel, table=True):
+    """已撤销令牌模型，记录登出后仍未过期的令牌"""
+    __tablename__ = "revoked_token"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(..., index=True, unique=True, description="令牌ID")
+    user_id: int = Field(..., index=True, description="用户ID")
+    expires_at: datetime = Field(..., index=True, description="令牌过期时间，过期后记录可删除")
+    revoked_at: datetime = Field(default_factory=datetime.utcnow, index=True, description="撤销时间，各进程按此增量同步")
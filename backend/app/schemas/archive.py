@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -25,6 +25,7 @@ class ArchiveCategoryUpdate(SQLModel):
 class ArchiveCategoryInDB(ArchiveCategoryBase):
     """数据库中的档案分类模型"""
     id: int
+    path: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -34,6 +35,11 @@ class ArchiveCategory(ArchiveCategoryInDB):
     pass
 
 
+class ArchiveCategoryTree(ArchiveCategory):
+    """档案分类树节点响应模型"""
+    children: List["ArchiveCategoryTree"] = []
+
+
 class ArchiveBase(SQLModel):
     """档案基础模型"""
     title: str
@@ -60,6 +66,9 @@ class ArchiveUpdate(SQLModel):
 class ArchiveInDB(ArchiveBase):
     """数据库中的档案模型"""
     id: int
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    file_hash: Optional[str] = None
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: datetime
@@ -68,3 +77,58 @@ class ArchiveInDB(ArchiveBase):
 class Archive(ArchiveInDB):
     """档案响应模型"""
     pass
+
+
+class ArchiveImportError(SQLModel):
+    """档案批量导入的行错误"""
+    line: int
+    error: str
+
+
+class ArchiveImportResult(SQLModel):
+    """档案批量导入结果"""
+    inserted: int
+    failed: int
+    errors: List[ArchiveImportError] = []
+
+
+class ArchiveBulkSelector(SQLModel):
+    """档案批量操作的选择条件，ID列表与列表接口的筛选条件同时指定时取交集"""
+    ids: Optional[List[int]] = None
+    name: Optional[str] = None
+    category_id: Optional[int] = None
+    include_descendants: bool = False
+    dry_run: bool = False
+
+
+class ArchiveBulkUpdate(ArchiveBulkSelector):
+    """批量更新档案模型"""
+    values: ArchiveUpdate
+
+
+class ArchiveBulkDelete(ArchiveBulkSelector):
+    """批量删除档案模型"""
+    pass
+
+
+class ArchiveBulkResult(SQLModel):
+    """档案批量操作结果，dry_run 时为将受影响的档案数"""
+    affected: int
+    dry_run: bool
+
+
+class ArchiveUploadCreate(SQLModel):
+    """创建断点续传会话模型"""
+    file_name: str
+    file_size: int
+
+
+class ArchiveUpload(SQLModel):
+    """断点续传会话响应模型"""
+    id: str
+    archive_id: int
+    file_name: str
+    file_size: int
+    offset: int
+    completed: bool = False
+    created_at: datetime
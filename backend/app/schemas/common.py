@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """分页响应模型"""
+    items: List[T]
+    total: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
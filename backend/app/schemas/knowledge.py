@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -47,6 +47,7 @@ class KnowledgeCategoryUpdate(SQLModel):
 class KnowledgeCategoryInDB(KnowledgeCategoryBase):
     """数据库中的知识分类模型"""
     id: int
+    path: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -56,6 +57,11 @@ class KnowledgeCategory(KnowledgeCategoryInDB):
     pass
 
 
+class KnowledgeCategoryTree(KnowledgeCategory):
+    """知识分类树节点响应模型"""
+    children: List["KnowledgeCategoryTree"] = []
+
+
 class KnowledgeArticleBase(SQLModel):
     """知识文章基础模型"""
     title: str
@@ -93,3 +99,17 @@ class KnowledgeArticleInDB(KnowledgeArticleBase):
 class KnowledgeArticle(KnowledgeArticleInDB):
     """知识文章响应模型"""
     pass
+
+
+class KnowledgeArticleListItem(SQLModel):
+    """知识文章列表项模型（不含正文）"""
+    id: int
+    title: str
+    summary: Optional[str] = None
+    tags: Optional[str] = None
+    category_id: Optional[int] = None
+    status: str
+    created_by: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    published_at: Optional[datetime] = None
@@ -16,6 +16,14 @@ class UserCreate(UserBase):
     password: str
 
 
+class UserRegister(SQLModel):
+    """用户注册模型，不包含角色，角色只能由管理员分配"""
+    username: str
+    name: str
+    email: str
+    password: str
+
+
 class UserUpdate(SQLModel):
     """更新用户模型"""
     name: Optional[str] = None
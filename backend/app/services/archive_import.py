@@ -0,0 +1,193 @@
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Set
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.core.config import settings
+from app.models.archive import Archive, ArchiveCategory
+from app.schemas.archive import ArchiveCreate
+from app.services import blobs
+
+# 支持的导入格式
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """
+    根据请求的Content-Type判断导入格式
+
+    Args:
+        content_type: 请求头中的Content-Type
+
+    Returns:
+        导入格式，无法识别时为None
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    return None
+
+
+class ArchiveImporter:
+    """
+    档案批量导入
+
+    逐块读取请求体并按行解析，不在内存中保留整个请求体。分类ID在导入前一次性加载后
+    在内存中校验；校验通过的行累积到 BULK_IMPORT_CHUNK_SIZE 后以一条 executemany
+    插入并提交，每个批次是独立的事务，导入中途出错时已提交的批次保留。
+    """
+
+    def __init__(self, db: AsyncSession, fmt: str, created_by: Optional[int]):
+        """
+        Args:
+            db: 数据库会话
+            fmt: 导入格式，ndjson 或 csv
+            created_by: 创建者ID
+        """
+        self.db = db
+        self.format = fmt
+        self.created_by = created_by
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self._category_ids: Set[int] = set()
+        self._rows: List[dict] = []
+        # 已读取的物理行数，错误报告中的行号从1开始
+        self._line = 0
+        # CSV表头，以及引号内含换行、尚未读完的记录
+        self._header: Optional[List[str]] = None
+        self._pending: List[bytes] = []
+        self._pending_line = 0
+        self._pending_quotes = 0
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        导入请求体中的全部档案
+
+        Args:
+            chunks: 请求体数据块
+
+        Returns:
+            插入行数、失败行数和行错误列表
+
+        Raises:
+            HTTPException: 如果CSV缺少表头或title列
+        """
+        result = await self.db.execute(select(ArchiveCategory.id))
+        self._category_ids = set(result.scalars().all())
+
+        buffer = b""
+        async for chunk in chunks:
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            await self._feed(lines)
+        if buffer:
+            await self._feed([buffer])
+
+        if self._pending:
+            self._error(self._pending_line, "Unterminated quoted field")
+        await self._flush()
+
+        return {"inserted": self.inserted, "failed": self.failed, "errors": self.errors}
+
+    async def _feed(self, lines: List[bytes]) -> None:
+        for raw in lines:
+            self._line += 1
+            if self.format == "csv":
+                self._parse_csv(raw)
+            else:
+                self._parse_ndjson(raw)
+            if len(self._rows) >= settings.BULK_IMPORT_CHUNK_SIZE:
+                await self._flush()
+
+    def _parse_ndjson(self, raw: bytes) -> None:
+        if not raw.strip():
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError as exc:
+            self._error(self._line, f"Invalid JSON: {exc}")
+            return
+        if not isinstance(data, dict):
+            self._error(self._line, "Expected a JSON object")
+            return
+        self._add(self._line, data)
+
+    def _parse_csv(self, raw: bytes) -> None:
+        # 引号成对出现（含转义的 ""），引号数为奇数说明字段内有换行，记录尚未结束
+        if not self._pending:
+            self._pending_line = self._line
+        self._pending.append(raw)
+        self._pending_quotes += raw.count(b'"')
+        if self._pending_quotes % 2:
+            return
+
+        record = b"\n".join(self._pending)
+        line = self._pending_line
+        self._pending = []
+        self._pending_quotes = 0
+        if not record.strip():
+            return
+
+        try:
+            text = record.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            self._error(line, f"Invalid UTF-8: {exc}")
+            return
+        values = next(csv.reader([text]))
+
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            if self._header:
+                self._header[0] = self._header[0].lstrip("\ufeff")
+            if "title" not in self._header:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="CSV header must include a title column"
+                )
+            return
+
+        if len(values) != len(self._header):
+            self._error(line, f"Expected {len(self._header)} columns, got {len(values)}")
+            return
+        # 空单元格视为未填写，使用模型默认值
+        self._add(line, {name: value for name, value in zip(self._header, values) if value != ""})
+
+    def _add(self, line: int, data: dict) -> None:
+        try:
+            archive = ArchiveCreate.model_validate(data)
+        except ValidationError as exc:
+            self._error(line, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            ))
+            return
+        if archive.category_id and archive.category_id not in self._category_ids:
+            self._error(line, "Archive category not found")
+            return
+        if blobs.is_blob_path(archive.file_path):
+            # 导入的档案不持有内容寻址存储中文件的引用
+            self._error(line, "file_path must not point into the blob store")
+            return
+        self._rows.append(archive.model_dump())
+
+    def _error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.BULK_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    async def _flush(self) -> None:
+        if not self._rows:
+            return
+        now = datetime.utcnow()
+        for row in self._rows:
+            row.update(created_by=self.created_by, created_at=now, updated_at=now)
+        await self.db.execute(insert(Archive), self._rows)
+        await self.db.commit()
+        self.inserted += len(self._rows)
+        self._rows = []
@@ -0,0 +1,246 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, delete, func, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.models.system import FileBlob
+from app.services.storage import resolve_path, upload_root
+
+# 内容寻址存储所在的子目录，文件按哈希前两级分片存放
+BLOB_DIR = "blobs"
+
+# 每批检查或删除的文件数
+_GC_BATCH_SIZE = 500
+
+# 最近一次垃圾回收的结果
+gc_stats: Dict[str, Optional[object]] = {
+    "last_run_at": None,
+    "deleted_blobs": 0,
+    "deleted_orphans": 0,
+    "freed_bytes": 0,
+}
+
+
+def blob_path(digest: str) -> str:
+    """
+    获取内容哈希对应的存储路径，如 blobs/ab/cd/abcd...
+
+    Args:
+        digest: 文件内容的SHA-256（十六进制）
+
+    Returns:
+        相对于存储目录的路径
+    """
+    return f"{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def is_blob_path(file_path: Optional[str]) -> bool:
+    """
+    判断路径是否位于内容寻址存储中，这类文件只能由垃圾回收删除
+
+    按解析后的绝对路径判断，./blobs/... 或 x/../blobs/... 等写法同样视为位于存储中。
+
+    Args:
+        file_path: 相对于存储目录的路径
+
+    Returns:
+        是否为内容寻址存储中的文件
+    """
+    path = resolve_path(file_path)
+    return path is not None and upload_root() / BLOB_DIR in path.parents
+
+
+async def acquire_blob(db: AsyncSession, digest: str, size: int, source: Path) -> str:
+    """
+    为文件增加一次引用并将临时文件放入内容寻址存储，已有相同内容时丢弃临时文件
+
+    先在当前事务中登记引用再放入文件：垃圾回收删除文件前在同一行上加锁，
+    两者不会交错，不会出现登记了引用但文件已被回收的情况。引用在调用方提交后生效，
+    提交失败时放入的文件没有记录，由垃圾回收清理。
+
+    Args:
+        db: 数据库会话
+        digest: 文件内容的SHA-256（十六进制）
+        size: 文件大小（字节）
+        source: 写完的临时文件
+
+    Returns:
+        相对于存储目录的文件路径
+    """
+    stmt = upsert_insert(db, FileBlob).values(hash=digest, size=size, ref_count=1, created_at=datetime.utcnow())
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[FileBlob.hash],
+        set_={"ref_count": FileBlob.ref_count + 1}
+    ))
+
+    file_path = blob_path(digest)
+    target = upload_root() / file_path
+
+    def place():
+        if target.exists():
+            source.unlink(missing_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+
+    await run_in_threadpool(place)
+    return file_path
+
+
+async def release_blobs(db: AsyncSession, counts: Dict[str, int]) -> None:
+    """
+    减少文件的引用计数，归零的文件在宽限期后由垃圾回收删除
+
+    Args:
+        db: 数据库会话
+        counts: 文件内容哈希到减少次数的映射
+    """
+    if not counts:
+        return
+    table = FileBlob.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.hash == bindparam("blob_hash"))
+        .values(ref_count=table.c.ref_count - bindparam("released"), released_at=datetime.utcnow()),
+        [{"blob_hash": digest, "released": count} for digest, count in counts.items()]
+    )
+
+
+def _blob_files(root: Path) -> List[Path]:
+    directory = root / BLOB_DIR
+    if not directory.is_dir():
+        return []
+    return [path for path in directory.glob("*/*/*") if path.is_file()]
+
+
+async def collect_garbage(engine: AsyncEngine) -> dict:
+    """
+    执行一次垃圾回收
+
+    删除引用计数归零超过宽限期的文件及其记录，以及存储目录中超过宽限期仍没有记录的文件
+    （上传事务提交失败时留下）。每个文件都在锁定其记录行的写事务中删除，与登记引用互斥。
+
+    Args:
+        engine: 异步引擎
+
+    Returns:
+        本次删除的文件数和释放的字节数
+    """
+    root = upload_root()
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.BLOB_GC_GRACE_SECONDS)
+    deleted_blobs = deleted_orphans = freed_bytes = 0
+
+    async with AsyncSession(engine) as db:
+        result = await db.execute(
+            select(FileBlob.hash, FileBlob.size).where(FileBlob.ref_count <= 0, FileBlob.released_at < cutoff)
+        )
+        candidates = result.all()
+        # 结束读事务，每个文件的删除在独立的写事务中完成
+        await db.commit()
+        for digest, size in candidates:
+            deleted = await db.execute(delete(FileBlob).where(FileBlob.hash == digest, FileBlob.ref_count <= 0))
+            if deleted.rowcount:
+                await run_in_threadpool((root / blob_path(digest)).unlink, missing_ok=True)
+                deleted_blobs += 1
+                freed_bytes += size
+            await db.commit()
+
+        # 没有记录的文件按修改时间判断宽限期，放入存储时 os.replace 保留临时文件的修改时间
+        files = await run_in_threadpool(_blob_files, root)
+        for start in range(0, len(files), _GC_BATCH_SIZE):
+            batch = {path.name: path for path in files[start:start + _GC_BATCH_SIZE]}
+            result = await db.execute(select(FileBlob.hash).where(FileBlob.hash.in_(batch)))
+            known = set(result.scalars().all())
+            await db.commit()
+            for digest, path in batch.items():
+                if digest in known:
+                    continue
+                try:
+                    stat = await run_in_threadpool(path.stat)
+                except FileNotFoundError:
+                    continue
+                if datetime.utcfromtimestamp(stat.st_mtime) >= cutoff:
+                    continue
+                # 读取 known 之后可能有上传登记了相同内容并沿用了该文件：插入占位记录在该行上加锁，
+                # 插入成功说明仍没有记录，与登记引用互斥地删除文件，再删除占位记录
+                claimed = await db.execute(
+                    upsert_insert(db, FileBlob)
+                    .values(hash=digest, size=stat.st_size, ref_count=0, created_at=datetime.utcnow())
+                    .on_conflict_do_nothing(index_elements=[FileBlob.hash])
+                )
+                if claimed.rowcount:
+                    await run_in_threadpool(path.unlink, missing_ok=True)
+                    await db.execute(delete(FileBlob).where(FileBlob.hash == digest))
+                    deleted_orphans += 1
+                    freed_bytes += stat.st_size
+                await db.commit()
+
+    gc_stats.update(
+        last_run_at=datetime.utcnow(),
+        deleted_blobs=deleted_blobs,
+        deleted_orphans=deleted_orphans,
+        freed_bytes=freed_bytes,
+    )
+    return dict(gc_stats)
+
+
+async def run_garbage_collector(engine: AsyncEngine) -> None:
+    """
+    每 BLOB_GC_INTERVAL_SECONDS 秒执行一次垃圾回收，直到任务被取消
+
+    Args:
+        engine: 异步引擎
+    """
+    if settings.BLOB_GC_INTERVAL_SECONDS <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(settings.BLOB_GC_INTERVAL_SECONDS)
+        try:
+            await collect_garbage(engine)
+        except Exception as e:
+            print(f"Blob garbage collection failed: {e}")
+
+
+async def storage_stats(db: AsyncSession) -> dict:
+    """
+    获取内容寻址存储的去重统计
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        文件数、引用数、实际占用和按引用计算的逻辑大小，以及去重比（逻辑大小 / 实际占用）
+    """
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(FileBlob.ref_count), 0),
+            func.coalesce(func.sum(FileBlob.size), 0),
+            func.coalesce(func.sum(FileBlob.size * FileBlob.ref_count), 0),
+        ).where(FileBlob.ref_count > 0)
+    )
+    blobs, references, stored_bytes, logical_bytes = result.one()
+
+    result = await db.execute(
+        select(func.count(), func.coalesce(func.sum(FileBlob.size), 0)).where(FileBlob.ref_count <= 0)
+    )
+    unreferenced_blobs, unreferenced_bytes = result.one()
+
+    return {
+        "blobs": blobs,
+        "references": references,
+        "stored_bytes": stored_bytes,
+        "logical_bytes": logical_bytes,
+        "saved_bytes": logical_bytes - stored_bytes,
+        "dedup_ratio": round(logical_bytes / stored_bytes, 3) if stored_bytes else 1.0,
+        "unreferenced_blobs": unreferenced_blobs,
+        "unreferenced_bytes": unreferenced_bytes,
+        "gc": gc_stats,
+    }
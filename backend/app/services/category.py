@@ -0,0 +1,185 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Optional, Type
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy import event, func, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.models.system import CacheVersion
+
+# 分类使用物化路径表示层级，如 "/1/5/9/" 表示 9 的父分类为 5、祖先为 1。
+# 子树内所有分类的路径都以该分类的路径为前缀，查询子树和检测环都只需比较前缀。
+
+
+def build_path(parent_path: Optional[str], category_id: int) -> str:
+    """
+    根据父分类路径生成分类路径
+
+    Args:
+        parent_path: 父分类路径，顶级分类为None
+        category_id: 分类ID
+
+    Returns:
+        分类路径
+    """
+    return f"{parent_path or '/'}{category_id}/"
+
+
+async def assign_path(db: AsyncSession, category: SQLModel, parent: Optional[SQLModel]) -> None:
+    """
+    为新建分类设置路径，分类需已写入以获得ID
+
+    Args:
+        db: 数据库会话
+        category: 分类实例
+        parent: 父分类实例
+    """
+    if category.id is None:
+        await db.flush()
+    category.path = build_path(parent.path if parent else None, category.id)
+
+
+async def move_subtree(db: AsyncSession, model: Type[SQLModel], category: SQLModel, parent: Optional[SQLModel]) -> None:
+    """
+    移动分类到新的父分类下，并用一条UPDATE改写整棵子树的路径
+
+    Args:
+        db: 数据库会话
+        model: 分类模型类
+        category: 要移动的分类
+        parent: 新的父分类，None表示移动为顶级分类
+
+    Raises:
+        HTTPException: 如果新的父分类是该分类自身或其子孙分类
+    """
+    old_path = category.path
+    if parent is not None and parent.path.startswith(old_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot move category under itself or its descendants"
+        )
+
+    new_path = build_path(parent.path if parent else None, category.id)
+    if new_path == old_path:
+        return
+
+    await db.execute(
+        update(model)
+        .where(model.path >= old_path, model.path < _upper_bound(old_path))
+        .values(path=literal(new_path) + func.substr(model.path, len(old_path) + 1))
+        .execution_options(synchronize_session=False)
+    )
+    category.path = new_path
+
+
+def _upper_bound(path: str) -> str:
+    # 路径以"/"结尾，把结尾的"/"换成其后一个字符"0"即得到前缀区间的上界
+    return path[:-1] + "0"
+
+
+def subtree_ids(model: Type[SQLModel], category_id: int):
+    """
+    查询分类及其所有子孙分类的ID，按路径区间在索引上查找
+
+    Args:
+        model: 分类模型类
+        category_id: 分类ID
+
+    Returns:
+        分类ID子查询
+    """
+    prefix = select(model.path).where(model.id == category_id).scalar_subquery()
+    upper = func.substr(prefix, 1, func.length(prefix) - 1) + "0"
+    return select(model.id).where(model.path >= prefix, model.path < upper)
+
+
+class CategoryTreeCache:
+    """
+    进程内的分类树缓存
+
+    分类树构建一次后以JSON保存在内存中。本进程的写入直接清空缓存；
+    其他进程的写入通过数据库中的版本号感知，版本号最多每
+    CATEGORY_TREE_CHECK_SECONDS 秒检查一次，其余读取不访问数据库。
+    """
+
+    def __init__(self, model: Type[SQLModel], schema: Type[SQLModel]):
+        """
+        Args:
+            model: 分类模型类
+            schema: 分类树节点响应模型
+        """
+        self.model = model
+        self.name = f"{model.__tablename__}_tree"
+        self._adapter = TypeAdapter(list[schema])
+        self._content: Optional[bytes] = None
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> bytes:
+        """
+        获取序列化后的分类树
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            分类树JSON
+        """
+        now = time.monotonic()
+        content = self._content
+        if content is not None and now - self._checked_at < settings.CATEGORY_TREE_CHECK_SECONDS:
+            return content
+
+        async with self._lock:
+            version = (await db.execute(
+                select(CacheVersion.version).where(CacheVersion.name == self.name)
+            )).scalar() or 0
+            if self._content is None or version != self._version:
+                self._content = await self._build(db)
+                self._version = version
+            self._checked_at = now
+            return self._content
+
+    async def _build(self, db: AsyncSession) -> bytes:
+        # 按路径排序保证父分类先于子分类出现，一次遍历即可组装整棵树
+        categories = (await db.execute(select(self.model).order_by(self.model.path))).scalars().all()
+
+        nodes: dict = {}
+        roots = []
+        for category in categories:
+            node: dict[str, Any] = {**category.model_dump(), "children": []}
+            nodes[category.id] = node
+            parent = nodes.get(category.parent_id)
+            if parent is not None:
+                parent["children"].append(node)
+            else:
+                roots.append(node)
+
+        return self._adapter.dump_json(self._adapter.validate_python(roots))
+
+    def clear(self) -> None:
+        """清空本进程的缓存"""
+        # 在提交事务的回调中同步调用，不获取异步锁；先清空内容使后续读取重新检查版本号
+        self._content = None
+        self._version = None
+
+    async def invalidate(self, db: AsyncSession) -> None:
+        """
+        在分类写入的事务中递增版本号，并在事务提交后清空本进程的缓存
+
+        Args:
+            db: 数据库会话
+        """
+        stmt = upsert_insert(db, CacheVersion).values(
+            name=self.name, version=1, updated_at=datetime.utcnow()
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1, "updated_at": stmt.excluded.updated_at}
+        ))
+        event.listen(db.sync_session, "after_commit", lambda session: self.clear(), once=True)
@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from app.core import security
+from app.core.config import settings
+
+# 用户不存在时用于校验的哈希值，使登录失败的耗时与密码错误时一致，避免通过耗时枚举用户名
+DUMMY_PASSWORD_HASH = "$pbkdf2-sha256$29000$nRPi/P9fC.F8r7WWco7Reg$Bag6Bc2awsAi3G0tnsBcwFUyp/11oj1QYXwreK/FPuU"
+
+
+class PasswordHasher:
+    """
+    在进程池中计算密码哈希
+
+    pbkdf2 每次计算需要数百毫秒的CPU，放在请求线程中会占满线程池并受GIL影响。
+    同时进行的计算数不超过进程数，排队的请求数超过上限时直接返回503，
+    避免请求堆积导致所有登录都超时。
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """
+        Args:
+            max_workers: 哈希进程数
+            max_pending: 正在计算和排队的请求总数上限
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 首次使用时再创建进程池；使用spawn避免在多线程进程中fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Password service busy, please retry later",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        """
+        获取密码哈希值
+
+        Args:
+            password: 明文密码
+
+        Returns:
+            哈希后的密码
+
+        Raises:
+            HTTPException: 如果排队的请求数已达上限
+        """
+        return await self._run(security.get_password_hash, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        验证密码
+
+        Args:
+            plain_password: 明文密码
+            hashed_password: 哈希密码
+
+        Returns:
+            密码是否匹配
+
+        Raises:
+            HTTPException: 如果排队的请求数已达上限
+        """
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """关闭进程池，在应用关闭时调用"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.core.config import settings
+from app.models.user import RevokedToken
+
+
+def _sync_overlap() -> timedelta:
+    return timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+
+
+class TokenBlocklist:
+    """
+    已撤销令牌的进程内集合
+
+    撤销记录持久化在 revoked_token 表中。每个进程在内存中保存未过期的 jti，
+    最多每 TOKEN_REVOCATION_REFRESH_SECONDS 秒按撤销时间增量读取一次新记录，
+    其余请求的检查只是一次集合查找。本进程的撤销立即生效，其他进程在下一次同步后生效。
+
+    不按ID增量同步：SQLite 会复用删除后的ID，PostgreSQL 的序列值也可能乱序提交，
+    都会使新记录落在已同步的ID之下。按撤销时间同步时每次重复读取最近
+    TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS 秒的记录，覆盖提交延迟和服务器间的时钟偏差。
+    """
+
+    def __init__(self):
+        self._expires: Dict[str, datetime] = {}
+        self._synced_until: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def is_revoked(self, db: AsyncSession, jti: str) -> bool:
+        """
+        检查令牌是否已撤销
+
+        Args:
+            db: 数据库会话
+            jti: 令牌ID
+
+        Returns:
+            令牌是否已撤销
+        """
+        if time.monotonic() - self._checked_at >= settings.TOKEN_REVOCATION_REFRESH_SECONDS:
+            await self.refresh(db)
+        return jti in self._expires
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """
+        读取上次同步之后新增的撤销记录，并丢弃内存中已过期的令牌
+
+        Args:
+            db: 数据库会话
+        """
+        async with self._lock:
+            now = datetime.utcnow()
+            query = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+                RevokedToken.expires_at > now
+            )
+            if self._synced_until is not None:
+                query = query.where(RevokedToken.revoked_at > self._synced_until - _sync_overlap())
+            rows = (await db.execute(query)).all()
+            for row in rows:
+                self._expires[row.jti] = row.expires_at
+                if self._synced_until is None or row.revoked_at > self._synced_until:
+                    self._synced_until = row.revoked_at
+            if self._synced_until is None:
+                self._synced_until = now
+
+            # 过期的令牌会被签名校验拒绝，无需继续保留
+            expired = [jti for jti, expires_at in self._expires.items() if expires_at <= now]
+            for jti in expired:
+                del self._expires[jti]
+
+            self._checked_at = time.monotonic()
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: int, expires_at: datetime) -> None:
+        """
+        撤销令牌，并顺带清理数据库中已过期的撤销记录
+
+        只删除过期超过同步窗口的记录：时钟偏慢的进程仍会接受刚过期的令牌，
+        记录需保留到所有进程都按签名校验拒绝该令牌之后。
+
+        Args:
+            db: 数据库会话
+            jti: 令牌ID
+            user_id: 用户ID
+            expires_at: 令牌过期时间
+        """
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow() - _sync_overlap()))
+        if (await db.execute(select(RevokedToken.id).where(RevokedToken.jti == jti))).first() is None:
+            db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        await db.commit()
+
+        self._expires[jti] = expires_at
+
+
+token_blocklist = TokenBlocklist()
@@ -0,0 +1,188 @@
+from sqlalchemy import text, table, column, literal_column, func, select, false
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.knowledge import KnowledgeArticle
+from app.services.tokenizer import get_tokenizer
+
+# FTS5 虚拟表名，rowid 与 KnowledgeArticle.id 一一对应
+FTS_TABLE = "knowledgearticle_fts"
+
+# 记录索引所用分词器的元数据表，分词器变更时需要重建索引
+FTS_META_TABLE = "knowledgearticle_fts_meta"
+
+# 索引列，顺序与bm25权重参数一致
+FTS_COLUMNS = ("title", "summary", "content", "tags")
+
+# 重建索引时每批写入的文章数
+REBUILD_BATCH_SIZE = 500
+
+# 用于构造查询的轻量表对象
+fts_table = table(FTS_TABLE, column("rowid"), *(column(name) for name in FTS_COLUMNS))
+
+# 当前数据库是否支持FTS5（非SQLite或未编译FTS5时回退为LIKE查询）
+_fts_available = False
+
+_INSERT_SQL = text(
+    f"INSERT INTO {FTS_TABLE}(rowid, title, summary, content, tags) "
+    "VALUES (:id, :title, :summary, :content, :tags)"
+)
+
+
+def is_available() -> bool:
+    """
+    全文索引是否可用
+
+    Returns:
+        FTS5索引是否已创建
+    """
+    return _fts_available
+
+
+def init_search_index(engine: Engine) -> None:
+    """
+    创建FTS5全文索引表，首次创建或分词器变更时从文章表重建
+
+    分词在Python侧完成，索引中保存以空格分隔的词元，
+    因此FTS5只需使用unicode61按空格切分。
+
+    Args:
+        engine: 数据库引擎
+    """
+    global _fts_available
+
+    if engine.dialect.name != "sqlite":
+        _fts_available = False
+        return
+
+    tokenizer = get_tokenizer()
+
+    with engine.begin() as conn:
+        try:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 0')"
+            ))
+        except OperationalError:
+            # SQLite未编译FTS5扩展
+            _fts_available = False
+            return
+
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {FTS_META_TABLE} (key TEXT PRIMARY KEY, value TEXT)"
+        ))
+        indexed_with = conn.execute(
+            text(f"SELECT value FROM {FTS_META_TABLE} WHERE key = 'tokenizer'")
+        ).scalar()
+
+        # 首次创建、分词器或其分词规则变更时重建索引
+        signature = f"{tokenizer.name}:{tokenizer.version}"
+        if indexed_with != signature:
+            _rebuild(conn)
+            conn.execute(
+                text(f"INSERT OR REPLACE INTO {FTS_META_TABLE}(key, value) VALUES ('tokenizer', :name)"),
+                {"name": signature}
+            )
+
+    _fts_available = True
+
+
+def _index_row(article) -> dict:
+    tokenizer = get_tokenizer()
+    row = {"id": article.id}
+    for name in FTS_COLUMNS:
+        row[name] = " ".join(tokenizer.tokenize(getattr(article, name)))
+    return row
+
+
+def _rebuild(conn) -> None:
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+
+    query = select(
+        KnowledgeArticle.id,
+        *(getattr(KnowledgeArticle, name) for name in FTS_COLUMNS)
+    ).execution_options(yield_per=REBUILD_BATCH_SIZE)
+
+    for rows in conn.execute(query).partitions():
+        conn.execute(_INSERT_SQL, [_index_row(row) for row in rows])
+
+
+async def rebuild_search_index(db: AsyncSession) -> None:
+    """
+    根据文章表重建全文索引
+
+    Args:
+        db: 数据库会话
+    """
+    if not _fts_available:
+        return
+    await db.run_sync(_rebuild)
+
+
+async def index_article(db: AsyncSession, article: KnowledgeArticle) -> None:
+    """
+    写入或更新单篇文章的索引，需在文章获得ID后调用
+
+    Args:
+        db: 数据库会话
+        article: 知识文章实例
+    """
+    if not _fts_available:
+        return
+
+    await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": article.id})
+    await db.execute(_INSERT_SQL, _index_row(article))
+
+
+async def remove_article(db: AsyncSession, article_id: int) -> None:
+    """
+    从索引中删除文章
+
+    Args:
+        db: 数据库会话
+        article_id: 知识文章ID
+    """
+    if not _fts_available:
+        return
+
+    await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": article_id})
+
+
+def bm25_rank():
+    """
+    按配置的字段权重计算BM25得分，得分越小越相关
+
+    Returns:
+        bm25() 表达式
+    """
+    return func.bm25(
+        literal_column(FTS_TABLE),
+        settings.SEARCH_WEIGHT_TITLE,
+        settings.SEARCH_WEIGHT_SUMMARY,
+        settings.SEARCH_WEIGHT_CONTENT,
+        settings.SEARCH_WEIGHT_TAGS
+    )
+
+
+def apply_search(query, search: str):
+    """
+    在文章查询上附加全文检索条件，并按BM25得分排序
+
+    Args:
+        query: KnowledgeArticle 查询
+        search: 搜索关键词
+
+    Returns:
+        附加检索条件后的查询
+    """
+    expression = get_tokenizer().build_query(search)
+    if not expression:
+        # 关键词中没有可检索的词元
+        return query.where(false())
+
+    return (
+        query.join(fts_table, fts_table.c.rowid == KnowledgeArticle.id)
+        .where(literal_column(FTS_TABLE).op("MATCH")(expression))
+        .order_by(bm25_rank())
+    )
@@ -0,0 +1,161 @@
+import hashlib
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+# 未完成的上传所在的子目录，完成后原子地移动到最终位置
+PARTIAL_DIR = ".partial"
+
+
+def upload_root() -> Path:
+    """
+    获取文件存储根目录
+
+    Returns:
+        存储根目录的绝对路径
+    """
+    return Path(settings.UPLOAD_DIR).resolve()
+
+
+def resolve_path(file_path: Optional[str]) -> Optional[Path]:
+    """
+    将档案的 file_path 解析为存储目录下的绝对路径
+
+    file_path 可能是客户端提交的任意字符串，解析结果不在存储目录下时视为无文件，
+    避免通过 ../ 读取或删除存储目录以外的文件。
+
+    Args:
+        file_path: 相对于存储目录的路径
+
+    Returns:
+        绝对路径，不在存储目录下时为None
+    """
+    if not file_path:
+        return None
+    root = upload_root()
+    path = (root / file_path).resolve()
+    if root not in path.parents or PARTIAL_DIR in path.relative_to(root).parts:
+        return None
+    return path
+
+
+def partial_path(name: str) -> Path:
+    """
+    获取未完成上传的临时文件路径
+
+    Args:
+        name: 临时文件名，断点续传时为上传ID
+
+    Returns:
+        临时文件的绝对路径
+    """
+    directory = upload_root() / PARTIAL_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+async def iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+    """
+    逐块读取multipart上传的文件
+
+    Args:
+        file: 上传的文件，超过内存阈值的部分已由Starlette暂存到磁盘
+
+    Yields:
+        文件数据块
+    """
+    while True:
+        chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def write_stream(
+    chunks: AsyncIterator[bytes],
+    path: Path,
+    limit: int,
+    append: bool = False,
+    digest=None
+) -> int:
+    """
+    将数据流写入文件，文件写入在线程池中执行，不阻塞事件循环
+
+    Args:
+        chunks: 数据块
+        path: 目标文件
+        limit: 本次最多写入的字节数
+        append: 是否追加到已有文件末尾
+        digest: hashlib 哈希对象，写入的同时计算内容哈希
+
+    Returns:
+        写入的字节数
+
+    Raises:
+        HTTPException: 如果数据超过 limit，已写入的部分保留在文件中
+    """
+    written = 0
+    file = await run_in_threadpool(open, path, "ab" if append else "wb")
+
+    def write(chunk: bytes) -> None:
+        # 哈希计算与写入在同一线程中完成，hashlib 处理大块数据时会释放GIL
+        if digest is not None:
+            digest.update(chunk)
+        file.write(chunk)
+
+    try:
+        async for chunk in chunks:
+            written += len(chunk)
+            if written > limit:
+                raise HTTPException(
+                    status_code=413,
+                    detail="File is larger than allowed"
+                )
+            await run_in_threadpool(write, chunk)
+    finally:
+        await run_in_threadpool(file.close)
+    return written
+
+
+async def hash_file(path: Path):
+    """
+    计算已有文件的SHA-256，用于续传时重建进程内没有的哈希状态
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        已更新文件内容的 hashlib 哈希对象
+    """
+    def read():
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(settings.UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest
+
+    return await run_in_threadpool(read)
+
+
+async def remove_file(file_path: Optional[str]) -> None:
+    """
+    删除存储目录下的文件，文件不存在或不在存储目录下时忽略
+
+    Args:
+        file_path: 相对于存储目录的路径
+    """
+    path = resolve_path(file_path)
+    if path is not None:
+        await run_in_threadpool(path.unlink, missing_ok=True)
+
+
+async def remove_partial(name: str) -> None:
+    """
+    删除未完成上传的临时文件
+
+    Args:
+        name: 临时文件名
+    """
+    await run_in_threadpool(partial_path(name).unlink, missing_ok=True)
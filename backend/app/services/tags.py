@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, func, insert, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from app.core.database import upsert_insert
+from app.models.knowledge import ArticleTag, KnowledgeArticle, KnowledgeTag
+
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    """
+    解析逗号分隔的标签字符串，去除空白和重复项
+
+    Args:
+        tags: 标签字符串
+
+    Returns:
+        保持原有顺序的标签名称列表
+    """
+    if not tags:
+        return []
+    return list(dict.fromkeys(tag.strip() for tag in tags.split(",") if tag.strip()))
+
+
+async def sync_article_tags(
+    db: AsyncSession,
+    article_id: int,
+    old_tags: List[str],
+    new_tags: List[str]
+) -> None:
+    """
+    根据新旧标签的差异维护文章标签关联和标签使用次数
+
+    计数在数据库中原子完成，无论标签数量多少，新增和移除各只需两条语句。
+
+    Args:
+        db: 数据库会话
+        article_id: 知识文章ID
+        old_tags: 原标签名称列表
+        new_tags: 新标签名称列表
+    """
+    added = [name for name in new_tags if name not in old_tags]
+    removed = [name for name in old_tags if name not in new_tags]
+
+    if removed:
+        # 减少移除标签的使用次数并删除关联
+        await db.execute(
+            update(KnowledgeTag)
+            .where(KnowledgeTag.name.in_(removed), KnowledgeTag.usage_count > 0)
+            .values(usage_count=KnowledgeTag.usage_count - 1)
+        )
+        await db.execute(
+            delete(ArticleTag).where(
+                ArticleTag.article_id == article_id,
+                ArticleTag.tag_id.in_(select(KnowledgeTag.id).where(KnowledgeTag.name.in_(removed)))
+            )
+        )
+
+    if added:
+        # 新增标签使用次数加一，不存在的标签自动创建
+        now = datetime.utcnow()
+        stmt = upsert_insert(db, KnowledgeTag).values([
+            {"name": name, "usage_count": 1, "created_at": now} for name in added
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[KnowledgeTag.name],
+            set_={"usage_count": KnowledgeTag.usage_count + 1}
+        ))
+        await db.execute(
+            insert(ArticleTag).from_select(
+                ["article_id", "tag_id"],
+                select(literal(article_id), KnowledgeTag.id).where(KnowledgeTag.name.in_(added))
+            )
+        )
+
+
+async def recount_tag_usage(db: AsyncSession) -> int:
+    """
+    根据文章标签关联表重新计算所有标签的使用次数，用于修复计数偏差
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        更新的标签数量
+    """
+    usage = (
+        select(func.count())
+        .select_from(ArticleTag)
+        .where(ArticleTag.tag_id == KnowledgeTag.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(update(KnowledgeTag).values(usage_count=usage))
+    return result.rowcount
+
+
+def filter_by_tag(query, tag: str):
+    """
+    通过文章标签关联表按标签名称筛选文章
+
+    Args:
+        query: KnowledgeArticle 查询
+        tag: 标签名称
+
+    Returns:
+        附加标签筛选条件后的查询
+    """
+    return (
+        query.join(ArticleTag, ArticleTag.article_id == KnowledgeArticle.id)
+        .join(KnowledgeTag, KnowledgeTag.id == ArticleTag.tag_id)
+        .where(KnowledgeTag.name == tag.strip())
+    )
@@ -0,0 +1,167 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+from app.core.config import settings
+
+# 中日韩统一表意文字、扩展A区及兼容表意文字
+_CJK_RANGES = "㐀-䶿一-鿿豈-﫿"
+
+# 连续的中日韩字符，或连续的字母数字
+_SEGMENT_PATTERN = re.compile(f"([{_CJK_RANGES}]+)|([^\\W_{_CJK_RANGES}]+)")
+
+
+def _quote(token: str) -> str:
+    """将词元转义为FTS5短语"""
+    return '"' + token.replace('"', '""') + '"'
+
+
+class Tokenizer(ABC):
+    """
+    分词器基类
+
+    分词结果以空格拼接后写入FTS5索引，查询时使用同一分词器生成MATCH表达式，
+    从而绕开SQLite内置分词器对中文的处理。
+    """
+    name: str = "base"
+    # 分词规则变更时递增，已有索引随之重建
+    version: int = 1
+
+    @abstractmethod
+    def tokenize(self, text: Optional[str]) -> List[str]:
+        """
+        将文本切分为词元
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            词元列表
+        """
+
+    def build_query(self, text: str) -> str:
+        """
+        将用户输入转换为FTS5查询表达式，多个关键词之间为AND关系
+
+        Args:
+            text: 搜索关键词
+
+        Returns:
+            FTS5 MATCH 表达式，无有效词元时返回空字符串
+        """
+        return " ".join(_quote(token) for token in self.tokenize(text))
+
+
+class CJKBigramTokenizer(Tokenizer):
+    """
+    中日韩二元分词器
+
+    连续的中文按相邻两字切分，末字另作为单字词元，字母数字按词切分并转为小写。
+    每个汉字都是某个二元组的首字或所在连续段的末字，单字查询按前缀匹配即可找到全部出现位置。
+    查询时每个关键词作为短语匹配，相邻词元必须连续出现，等价于子串匹配。
+    """
+    name = "cjk_bigram"
+    version = 2
+
+    def tokenize(self, text: Optional[str]) -> List[str]:
+        tokens, _ = self._split(text, query=False)
+        return tokens
+
+    def build_query(self, text: str) -> str:
+        phrases = []
+        for keyword in text.split():
+            tokens, prefix = self._split(keyword, query=True)
+            if tokens:
+                phrases.append(_quote(" ".join(tokens)) + ("*" if prefix else ""))
+        return " ".join(phrases)
+
+    def _split(self, text: Optional[str], query: bool) -> Tuple[List[str], bool]:
+        """
+        切分文本，返回词元列表以及最后一个词元是否需要按前缀匹配
+
+        关键词末尾的中文段在原文中可能还未结束，原文在该处没有末字词元，
+        因此查询时不生成关键词最后一段的末字词元；该段只有一个字时改为前缀匹配该字。
+        """
+        if not text:
+            return [], False
+
+        tokens = []
+        prefix = False
+        segments = list(_SEGMENT_PATTERN.finditer(text))
+        for index, match in enumerate(segments):
+            cjk, word = match.groups()
+            if word:
+                tokens.append(word.lower())
+                continue
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            if not query or index < len(segments) - 1:
+                tokens.append(cjk[-1])
+            elif len(cjk) == 1:
+                tokens.append(cjk)
+                prefix = True
+        return tokens, prefix
+
+
+class JiebaTokenizer(Tokenizer):
+    """
+    基于jieba词典的分词器（可选依赖）
+
+    使用搜索引擎模式切分，查询时各词元之间为AND关系。
+    """
+    name = "jieba"
+
+    def __init__(self):
+        try:
+            import jieba
+        except ImportError as e:
+            raise RuntimeError("SEARCH_TOKENIZER=jieba requires the 'jieba' package") from e
+        self._jieba = jieba
+
+    def tokenize(self, text: Optional[str]) -> List[str]:
+        if not text:
+            return []
+
+        tokens = []
+        for word in self._jieba.cut_for_search(text):
+            # 去除标点和空白，仅保留字母数字和汉字
+            for match in _SEGMENT_PATTERN.finditer(word):
+                tokens.append(match.group(0).lower())
+        return tokens
+
+
+# 已注册的分词器
+TOKENIZERS: Dict[str, Type[Tokenizer]] = {
+    CJKBigramTokenizer.name: CJKBigramTokenizer,
+    JiebaTokenizer.name: JiebaTokenizer,
+}
+
+_tokenizer: Optional[Tokenizer] = None
+
+
+def register_tokenizer(tokenizer_class: Type[Tokenizer]) -> None:
+    """
+    注册自定义分词器
+
+    Args:
+        tokenizer_class: 分词器类
+    """
+    TOKENIZERS[tokenizer_class.name] = tokenizer_class
+
+
+def get_tokenizer() -> Tokenizer:
+    """
+    获取配置中指定的分词器实例
+
+    Returns:
+        分词器实例
+
+    Raises:
+        ValueError: 如果分词器未注册
+    """
+    global _tokenizer
+
+    if _tokenizer is None or _tokenizer.name != settings.SEARCH_TOKENIZER:
+        tokenizer_class = TOKENIZERS.get(settings.SEARCH_TOKENIZER)
+        if tokenizer_class is None:
+            raise ValueError(f"Unknown search tokenizer: {settings.SEARCH_TOKENIZER}")
+        _tokenizer = tokenizer_class()
+    return _tokenizer
@@ -1,7 +1,12 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_engine, init_db
+from app.core.query_log import QueryContextMiddleware
+from app.core.sqlite import run_maintenance
+from app.services.blobs import run_garbage_collector
+from app.services.password import password_hasher
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -11,6 +16,9 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# 统计每个请求的SQL语句，并为慢查询日志提供路由
+app.add_middleware(QueryContextMiddleware)
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,13 +30,31 @@ app.add_middleware(
 
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """
     应用启动时执行
     """
     # 初始化数据库
     init_db()
     print("Database initialized successfully")
+    
+    # 定期维护SQLite统计信息和WAL文件
+    app.state.sqlite_maintenance = asyncio.create_task(run_maintenance(async_engine))
+    
+    # 定期回收不再被档案引用的文件
+    app.state.blob_gc = asyncio.create_task(run_garbage_collector(async_engine))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    应用关闭时执行
+    """
+    app.state.sqlite_maintenance.cancel()
+    app.state.blob_gc.cancel()
+    
+    # 关闭密码哈希进程池
+    password_hasher.shutdown()
 
 
 @app.get("/")
@@ -0,0 +1,70 @@
+"""
+档案批量导入接口的吞吐量测试
+
+在临时SQLite数据库上启动应用，分别以NDJSON和CSV格式向 POST /api/archive/bulk
+流式上传指定行数的档案，输出每秒导入的行数。
+
+用法（在 backend 目录下执行）：
+    python scripts/bench_archive_import.py --rows 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def ndjson_body(rows: int, category_id: int, chunk_rows: int = 2000):
+    for start in range(0, rows, chunk_rows):
+        yield "".join(
+            json.dumps({"title": f"legacy record {i}", "description": "imported", "category_id": category_id}) + "\n"
+            for i in range(start, min(start + chunk_rows, rows))
+        ).encode()
+
+
+def csv_body(rows: int, category_id: int, chunk_rows: int = 2000):
+    yield b"title,description,category_id\n"
+    for start in range(0, rows, chunk_rows):
+        yield "".join(
+            f"legacy record {i},imported,{category_id}\n" for i in range(start, min(start + chunk_rows, rows))
+        ).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="每种格式导入的行数")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ["DEBUG"] = "false"
+    os.chdir(directory)
+
+    from fastapi.testclient import TestClient
+    import main as app_main
+
+    with TestClient(app_main.app) as client:
+        token = client.post("/api/auth/login", data={"username": "admin", "password": "admin123"}).json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+        category_id = client.post("/api/archive/category", json={"name": "legacy"}).json()["id"]
+
+        for name, body, content_type in (
+            ("ndjson", ndjson_body, "application/x-ndjson"),
+            ("csv", csv_body, "text/csv"),
+        ):
+            started = time.perf_counter()
+            response = client.post(
+                "/api/archive/bulk",
+                content=body(args.rows, category_id),
+                headers={"Content-Type": content_type}
+            )
+            elapsed = time.perf_counter() - started
+            result = response.json()
+            print(f"{name:<7} inserted {result['inserted']:>8}   failed {result['failed']:>5}   {args.rows / elapsed:>9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+同步与异步数据库访问的吞吐量对比
+
+分别用同步会话（线程池中执行的 def 接口）和异步会话（async def 接口）提供相同的
+档案分页查询，在本地启动 uvicorn 后以相同并发发起请求，输出吞吐量和延迟分位数。
+
+用法（在 backend 目录下执行）：
+    python scripts/bench_async_db.py --rows 20000 --requests 3000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlmodel import SQLModel
+from app.models.archive import Archive, ArchiveCategory
+
+PAGE_SIZE = 20
+
+
+def seed(db_path: str, rows: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine, tables=[ArchiveCategory.__table__, Archive.__table__])
+    with engine.begin() as conn:
+        conn.execute(insert(ArchiveCategory), [{"name": f"c{i}", "path": f"/{i + 1}/"} for i in range(10)])
+        conn.execute(insert(Archive), [
+            {"title": f"archive {i}", "category_id": i % 10 + 1, "created_by": 1}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def list_query(page: int):
+    return (
+        select(Archive)
+        .where(Archive.category_id == page % 10 + 1)
+        .order_by(Archive.id)
+        .offset(page * PAGE_SIZE % 1000)
+        .limit(PAGE_SIZE)
+    )
+
+
+def count_query(page: int):
+    return select(func.count()).select_from(Archive).where(Archive.category_id == page % 10 + 1)
+
+
+def build_sync_app(db_path: str) -> FastAPI:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(engine, expire_on_commit=False)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/archives")
+    def archives(page: int = 0, db: Session = Depends(get_db)):
+        items = db.execute(list_query(page)).scalars().all()
+        total = db.execute(count_query(page)).scalar_one()
+        return {"items": items, "total": total}
+
+    return app
+
+
+def build_async_app(db_path: str) -> FastAPI:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/archives")
+    async def archives(page: int = 0, db: AsyncSession = Depends(get_db)):
+        items = (await db.execute(list_query(page))).scalars().all()
+        total = (await db.execute(count_query(page))).scalar_one()
+        return {"items": items, "total": total}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def drive(url: str, requests: int, concurrency: int) -> list:
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient):
+        for page in counter:
+            started = time.perf_counter()
+            response = await client.get(url, params={"page": page})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies
+
+
+def run(name: str, app: FastAPI, requests: int, concurrency: int) -> None:
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/archives"
+    # 预热连接和查询缓存
+    asyncio.run(drive(url, concurrency, concurrency))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(drive(url, requests, concurrency))
+    elapsed = time.perf_counter() - started
+
+    server.should_exit = True
+    thread.join()
+
+    latencies.sort()
+    print(
+        f"{name:<6} {requests / elapsed:>9.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:>7.2f} ms   "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:>7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="档案表记录数")
+    parser.add_argument("--requests", type=int, default=3000, help="每种模式的请求数")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发请求数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench.db")
+        seed(db_path, args.rows)
+        print(f"rows={args.rows} requests={args.requests} concurrency={args.concurrency}")
+        run("sync", build_sync_app(db_path), args.requests, args.concurrency)
+        run("async", build_async_app(db_path), args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
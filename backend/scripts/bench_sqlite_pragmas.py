@@ -0,0 +1,102 @@
+"""
+SQLite默认参数与配置的PRAGMA参数的并发读写对比
+
+多个写线程模拟 create_archive 的逐条插入并提交，同时多个读线程执行分页查询。
+分别在默认参数（回滚日志、synchronous=FULL、无忙等待）和 Settings 中的参数下运行，
+输出提交吞吐量、读取吞吐量和 "database is locked" 错误数。
+
+用法（在 backend 目录下执行）：
+    python scripts/bench_sqlite_pragmas.py --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+from app.core.sqlite import install_pragmas, sqlite_pragmas
+from app.models.archive import Archive, ArchiveCategory
+
+
+def build_engine(db_path: str, pragmas):
+    # 禁用驱动自带的5秒忙等待，使默认参数下的锁冲突直接暴露出来
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"timeout": 0, "check_same_thread": False},
+        poolclass=NullPool
+    )
+    install_pragmas(engine, pragmas)
+    return engine
+
+
+def run(name: str, pragmas, writers: int, readers: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(os.path.join(directory, "bench.db"), pragmas)
+        SQLModel.metadata.create_all(engine, tables=[ArchiveCategory.__table__, Archive.__table__])
+        with engine.begin() as conn:
+            conn.execute(insert(Archive), [{"title": f"seed {i}", "created_by": 1} for i in range(5000)])
+
+        counts = {"commits": 0, "reads": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def add(key: str) -> None:
+            with lock:
+                counts[key] += 1
+
+        def writer(worker: int) -> None:
+            with engine.connect() as conn:
+                while time.monotonic() < deadline:
+                    try:
+                        with conn.begin():
+                            conn.execute(insert(Archive).values(title=f"w{worker}", created_by=1))
+                        add("commits")
+                    except OperationalError:
+                        add("locked")
+
+        def reader() -> None:
+            with engine.connect() as conn:
+                while time.monotonic() < deadline:
+                    try:
+                        conn.execute(select(Archive).order_by(Archive.id.desc()).limit(20)).all()
+                        conn.rollback()
+                        add("reads")
+                    except OperationalError:
+                        conn.rollback()
+                        add("locked")
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(
+        f"{name:<8} commits {counts['commits'] / seconds:>9.1f}/s   "
+        f"reads {counts['reads'] / seconds:>9.1f}/s   locked errors {counts['locked']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="写线程数")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--seconds", type=float, default=10, help="每种参数的运行时间")
+    args = parser.parse_args()
+
+    print(f"writers={args.writers} readers={args.readers} seconds={args.seconds}")
+    run("default", [], args.writers, args.readers, args.seconds)
+    run("profile", sqlite_pragmas(), args.writers, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
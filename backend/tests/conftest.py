@@ -0,0 +1,68 @@
+"""
+测试公共配置
+
+在导入应用之前将数据库和上传目录指向临时目录，整个测试会话共用一个已写入样本数据、
+以管理员身份登录的 TestClient。
+
+用法（需要 pytest，在 backend 目录下执行）：
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_DATA_DIR = tempfile.mkdtemp(prefix="nanya-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATA_DIR, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_DATA_DIR, "uploads")
+os.environ["DEBUG"] = "false"
+
+# 样本数据量：每种列表至少有多行，逐行查询的N+1模式会使语句数明显超出预算
+SEED_ROWS = 20
+
+
+def seed(client) -> None:
+    """写入两级档案分类、知识分类，以及带分类和标签的档案、知识文章和用户"""
+    parent = client.post("/api/archive/category", json={"name": "root"}).json()["id"]
+    client.post("/api/archive/category", json={"name": "child", "parent_id": parent})
+    knowledge_parent = client.post("/api/knowledge/category", json={"name": "root"}).json()["id"]
+    client.post("/api/knowledge/category", json={"name": "child", "parent_id": knowledge_parent})
+    role = client.post("/api/users/roles", json={"name": "viewer", "permissions": "archive:read"}).json()["id"]
+    for i in range(SEED_ROWS):
+        client.post("/api/archive", json={"title": f"record {i}", "category_id": parent})
+        client.post("/api/knowledge", json={
+            "title": f"guideline {i}",
+            "content": "clinical guideline content",
+            "tags": f"tag{i % 3},common",
+            "category_id": knowledge_parent,
+            "status": "published" if i % 2 else "draft",
+        })
+        client.post("/api/users", json={
+            "username": f"user{i}",
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "password": "password123",
+            "role_id": role,
+        })
+
+
+@pytest.fixture(scope="session")
+def client():
+    """已写入样本数据并以管理员身份登录的客户端"""
+    from fastapi.testclient import TestClient
+    import main as app_main
+
+    previous = os.getcwd()
+    os.chdir(_DATA_DIR)
+    try:
+        with TestClient(app_main.app) as test_client:
+            token = test_client.post("/api/auth/login", data={"username": "admin", "password": "admin123"}).json()
+            test_client.headers["Authorization"] = f"Bearer {token['access_token']}"
+            seed(test_client)
+            yield test_client
+    finally:
+        os.chdir(previous)
@@ -0,0 +1,54 @@
+"""
+列表和详情接口的SQL语句预算
+
+每个接口在缓存全部失效的情况下执行的语句数不得超过预算：用户认证1条，
+需要权限的接口另有角色权限1条，envelope 分页另有总数1条。样本数据每种列表至少20行，
+逐行查询的N+1模式会使语句数远超预算。
+"""
+import pytest
+
+from app.api.deps import invalidate_user_cache
+from app.core.config import settings
+from app.core.pagination import invalidate_counts
+from app.core.permissions import invalidate_role_permissions
+from app.core.query_log import assert_max_queries
+
+# 每条规则：(说明, 路径, 查询参数, 语句预算)
+BUDGETS = [
+    ("archive list", "/api/archive", {}, 2),
+    ("archive list, envelope", "/api/archive", {"envelope": True}, 3),
+    ("archive by category subtree", "/api/archive", {"category_id": 1, "include_descendants": True}, 2),
+    ("archive detail", "/api/archive/1", {}, 2),
+    ("article list", "/api/knowledge", {}, 2),
+    ("article list, envelope", "/api/knowledge", {"envelope": True}, 3),
+    ("article by tag", "/api/knowledge", {"tag": "tag1"}, 2),
+    ("article by category subtree", "/api/knowledge", {"category_id": 1, "include_descendants": True}, 2),
+    ("article search", "/api/knowledge", {"search": "guideline"}, 2),
+    ("article detail", "/api/knowledge/1", {}, 2),
+    ("user list", "/api/users", {}, 3),
+    ("user list, envelope", "/api/users", {"envelope": True}, 4),
+    ("user detail", "/api/users/2", {}, 3),
+    ("role list", "/api/users/roles", {}, 3),
+]
+
+
+@pytest.fixture(autouse=True)
+def cold_caches(monkeypatch):
+    """清空用户、权限和总数缓存，并停止撤销令牌的定时同步，使语句数与执行顺序和耗时无关"""
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_REFRESH_SECONDS", float("inf"))
+    invalidate_user_cache()
+    invalidate_role_permissions()
+    for dataset in ("archive", "knowledge_article", "user"):
+        invalidate_counts(dataset)
+
+
+@pytest.mark.parametrize(
+    "path, params, budget",
+    [case[1:] for case in BUDGETS],
+    ids=[case[0] for case in BUDGETS]
+)
+def test_query_budget(client, path, params, budget):
+    with assert_max_queries(budget):
+        response = client.get(path, params=params)
+
+    assert response.status_code == 200, response.text
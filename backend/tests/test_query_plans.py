@@ -0,0 +1,83 @@
+"""
+列表和筛选接口的查询计划
+
+逐个调用列表、筛选和详情接口，对接口执行的每条SELECT语句运行 EXPLAIN QUERY PLAN。
+语句对业务表做全表扫描（SCAN 且未使用索引）时失败，除非该用例明确允许扫描该表
+（如无筛选条件的列表、标题模糊匹配）。
+
+不执行ANALYZE：少量样本数据的统计信息会让规划器倾向全表扫描，
+没有统计信息时SQLite按大表估算，更接近生产数据量下的计划。
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+from app.core.database import async_engine, engine
+
+# 每条规则：(说明, 路径, 查询参数, 允许全表扫描的表)
+CASES = [
+    ("archive list", "/api/archive", {}, {"archive"}),
+    ("archive by category", "/api/archive", {"category_id": 1}, set()),
+    ("archive by category subtree", "/api/archive", {"category_id": 1, "include_descendants": True}, set()),
+    ("archive by category, envelope", "/api/archive", {"category_id": 1, "envelope": True}, set()),
+    ("archive by title", "/api/archive", {"name": "record"}, {"archive"}),
+    ("archive cursor by created_at", "/api/archive", {"sort": "-created_at", "cursor": ""}, set()),
+    ("archive detail", "/api/archive/1", {}, set()),
+    ("archive categories", "/api/archive/category", {}, {"archivecategory"}),
+    ("archive category tree", "/api/archive/category/tree", {}, set()),
+    ("article list", "/api/knowledge", {}, {"knowledgearticle"}),
+    ("article by status", "/api/knowledge", {"status": "published"}, set()),
+    ("article by status and category", "/api/knowledge", {"status": "published", "category_id": 1}, set()),
+    ("article by category", "/api/knowledge", {"category_id": 1}, set()),
+    ("article by category subtree", "/api/knowledge", {"category_id": 1, "include_descendants": True}, set()),
+    ("article by tag", "/api/knowledge", {"tag": "tag1"}, set()),
+    ("article search", "/api/knowledge", {"search": "guideline"}, set()),
+    ("article cursor by updated_at", "/api/knowledge", {"sort": "-updated_at", "cursor": ""}, set()),
+    ("article detail", "/api/knowledge/1", {}, set()),
+    ("knowledge tags", "/api/knowledge/tag", {}, {"knowledgetag"}),
+    ("knowledge categories", "/api/knowledge/category", {}, {"knowledgecategory"}),
+    ("user list", "/api/users", {}, {"user"}),
+    ("user detail", "/api/users/1", {}, set()),
+    ("role list", "/api/users/roles", {}, {"role"}),
+]
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@pytest.fixture
+def captured_selects():
+    """记录请求处理期间异步引擎执行的SELECT语句及其参数"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield captured
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize(
+    "path, params, allowed",
+    [case[1:] for case in CASES],
+    ids=[case[0] for case in CASES]
+)
+def test_query_plan_uses_indexes(client, captured_selects, path, params, allowed):
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+
+    tables = set(SQLModel.metadata.tables)
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in captured_selects:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all():
+                match = _FULL_SCAN.match(row[-1])
+                if match and match.group(1) in tables and match.group(1) not in allowed:
+                    scans.append(f"{row[-1]}: {' '.join(statement.split())}")
+
+    assert not scans, "\n".join(scans)